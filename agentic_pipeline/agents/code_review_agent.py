@@ -1,12 +1,55 @@
 """Code Review Agent - Performs iterative code reviews."""
 
-import subprocess
-import json
-from typing import Any, Dict
+import asyncio
+import functools
+from typing import Any, Dict, List, Optional, Tuple
 
 from ..core.agent import Agent, AgentResult, AgentStatus
 from ..core.state import AgentState
 from ..core.config import AgentConfig
+from ..parsers.json_parsers import decode_json_object
+from ..utils.claude_cli import ClaudeSession, assistant_text, run_claude
+
+
+# Reviews only need to read the code; fixes may edit files but never run commands
+REVIEW_TOOLS = ["Read", "Grep", "Glob"]
+FIX_TOOLS = ["Read", "Edit", "Write"]
+
+# Only these severities are worth an automatic fix attempt
+_FIX_SEVERITIES = frozenset({"high", "medium"})
+
+
+@functools.cache
+def _make_review_prompt(criteria: Tuple[str, ...], files: Tuple[str, ...]) -> str:
+    """Build the review prompt; memoized since criteria and files rarely change between iterations."""
+    criteria_str = ", ".join(criteria)
+    
+    if files:
+        files_str = ", ".join(files)
+        file_instruction = f"Focus on these files: {files_str}"
+    else:
+        file_instruction = "Review all relevant code files in the project"
+    
+    return f"""
+    Perform a comprehensive code review focusing on: {criteria_str}
+    
+    {file_instruction}
+    
+    Please provide your response in JSON format with:
+    {{
+        "issues_found": [
+            {{"file": "filename", "line": 123, "issue": "description", "severity": "high|medium|low"}}
+        ],
+        "suggestions": [
+            {{"category": "performance", "suggestion": "description", "files": ["file1", "file2"]}}
+        ],
+        "quality_score": 7.5,
+        "files_reviewed": ["file1.py", "file2.js"],
+        "summary": "Overall review summary"
+    }}
+    
+    Focus on identifying specific, actionable improvements.
+    """
 
 
 class CodeReviewAgent(Agent):
@@ -38,6 +81,35 @@ class CodeReviewAgent(Agent):
             "type": "boolean",
             "required": False,
             "description": "Whether to automatically fix found issues"
+        },
+        "max_parallel_fixes": {
+            "type": "integer",
+            "required": False,
+            "default": 8,
+            "description": "Maximum number of concurrent fix attempts (default: 8)"
+        },
+        "review_model": {
+            "type": "string",
+            "required": False,
+            "description": "Claude model for the review pass (default: CLI default model)"
+        },
+        "fix_model": {
+            "type": "string",
+            "required": False,
+            "default": "haiku",
+            "description": "Claude model for mechanical fix attempts (default: haiku)"
+        },
+        "claude_timeout": {
+            "type": "integer",
+            "required": False,
+            "default": 300,
+            "description": "Seconds to wait for Claude per review or fix before failing (default: 300)"
+        },
+        "batch_shard_size": {
+            "type": "integer",
+            "required": False,
+            "default": 20,
+            "description": "Review target_files in concurrent shards of this many files (default: 20)"
         }
     }
     
@@ -47,8 +119,17 @@ class CodeReviewAgent(Agent):
         self.target_files = None
         self.review_criteria = None
         self.fix_issues = False
-        self.reviewed_files = []
+        self.max_parallel_fixes = 8
+        self.review_model = None
+        self.fix_model = "haiku"
+        self.claude_timeout = 300
+        self.batch_shard_size = 20
+        self.reviewed_files = set()
         self.issues_found = []
+        self._seen_issue_keys = set()
+        self._loop = None
+        self._shards = []
+        self._sessions = []
     
     def initialize(self, context: Dict[str, Any]) -> None:
         """Initialize the Code Review agent."""
@@ -60,48 +141,86 @@ class CodeReviewAgent(Agent):
             "code quality", "best practices", "performance", "security"
         ])
         self.fix_issues = self.config.get_parameter("fix_issues", False)
+        self.max_parallel_fixes = self.config.get_parameter("max_parallel_fixes", 8)
+        self.review_model = self.config.get_parameter("review_model")
+        self.fix_model = self.config.get_parameter("fix_model", "haiku")
+        self.claude_timeout = self.config.get_parameter("claude_timeout", 300)
+        self.batch_shard_size = self.config.get_parameter("batch_shard_size", 20)
+        
+        # Large file lists are split into shards reviewed concurrently, so
+        # wall-clock time follows the slowest shard rather than the total
+        if len(self.target_files) > self.batch_shard_size:
+            self._shards = [
+                self.target_files[i:i + self.batch_shard_size]
+                for i in range(0, len(self.target_files), self.batch_shard_size)
+            ]
+            self.log("info", f"Reviewing {len(self.target_files)} files in {len(self._shards)} shards")
+        else:
+            self._shards = [self.target_files]
+        
+        # One event loop and Claude session per shard for the whole run, so each
+        # session (and its prompt cache) persists across iterations
+        self._loop = asyncio.new_event_loop()
+        self._sessions = [
+            ClaudeSession(model=self.review_model, allowed_tools=REVIEW_TOOLS)
+            for _ in self._shards
+        ]
         
         self.status = AgentStatus.RUNNING
         self.log("info", f"Code Review Agent initialized with criteria: {self.review_criteria}")
     
     def execute_iteration(self, state: AgentState) -> AgentResult:
         """Execute one code review iteration."""
+        return self._loop.run_until_complete(self.execute_iteration_async(state))
+    
+    async def execute_iteration_async(self, state: AgentState) -> AgentResult:
+        """Execute one code review iteration without blocking the event loop."""
+        # The previous iteration already reached a terminal result; don't spend
+        # another Claude roundtrip confirming it
+        if self.check_terminal_condition(state):
+            self.status = AgentStatus.COMPLETED
+            return AgentResult(
+                status=self.status,
+                message="Already terminal, skipping Claude call",
+                data=state.data,
+                terminal=True
+            )
+        
         iteration_num = state.iteration + 1
         self.log("info", f"Executing code review iteration {iteration_num}")
         
         try:
-            # Build review prompt
-            review_prompt = self._build_review_prompt(state)
-            
-            # Execute Claude command for code review
-            cmd = [
-                'claude',
-                '--output-format', 'json',
-                '--dangerously-skip-permissions',
-                '-p', review_prompt
-            ]
-            
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
+            # Execute Claude for code review, one call per shard
+            responses = await asyncio.wait_for(
+                asyncio.gather(*(
+                    session.ask(self._build_review_prompt(state, shard), on_event=self._log_claude_event)
+                    for session, shard in zip(self._sessions, self._shards)
+                )),
+                timeout=self.claude_timeout
             )
             
-            stdout, stderr = process.communicate()
-            
-            if stderr:
-                self.log("warning", f"Claude stderr: {stderr}")
-            
-            # Parse response
-            review_result = self._parse_review_response(stdout)
+            # Parse responses
+            shard_results = []
+            for final_event in responses:
+                shard_results.append(
+                    self._parse_review_response(final_event.get("result", "") if final_event else "")
+                )
+            review_result = self._merge_review_results(shard_results)
             
             # Process review results
             issues_found = review_result.get("issues_found", [])
             suggestions = review_result.get("suggestions", [])
             quality_score = review_result.get("quality_score", 0)
             
-            self.issues_found.extend(issues_found)
+            # Claude often re-reports the same issue; only record and fix new ones
+            new_issues = []
+            for issue in issues_found:
+                key = (issue.get("file"), issue.get("line"), issue.get("issue"))
+                if key not in self._seen_issue_keys:
+                    self._seen_issue_keys.add(key)
+                    new_issues.append(issue)
+            self.issues_found.extend(new_issues)
+            self.reviewed_files.update(review_result.get("files_reviewed", []))
             
             # Determine if review is complete
             is_complete = (
@@ -117,8 +236,8 @@ class CodeReviewAgent(Agent):
                 status_message = f"Found {len(issues_found)} issues to address"
             
             # Optionally fix issues
-            if self.fix_issues and issues_found and not is_complete:
-                self._attempt_fixes(issues_found)
+            if self.fix_issues and new_issues and not is_complete:
+                await self._attempt_fixes(new_issues)
             
             iteration_data = {
                 "issues_found": issues_found,
@@ -135,6 +254,16 @@ class CodeReviewAgent(Agent):
                 terminal=is_complete
             )
         
+        except asyncio.TimeoutError:
+            self.log("error", f"Claude did not respond within {self.claude_timeout}s")
+            return AgentResult(
+                status=AgentStatus.FAILED,
+                message=f"Code review timed out after {self.claude_timeout}s",
+                data={},
+                terminal=True,
+                error=f"Claude timed out after {self.claude_timeout}s"
+            )
+        
         except Exception as e:
             self.log("error", f"Code review iteration failed: {e}")
             return AgentResult(
@@ -155,98 +284,119 @@ class CodeReviewAgent(Agent):
             return quality_score >= 8.0 or issues_count == 0
         return False
     
-    def _build_review_prompt(self, state: AgentState) -> str:
-        """Build the review prompt for Claude."""
-        criteria_str = ", ".join(self.review_criteria)
+    def _build_review_prompt(self, state: AgentState, files: List[str]) -> str:
+        """Build the review prompt for Claude covering the given files."""
+        return _make_review_prompt(tuple(self.review_criteria), tuple(files or ()))
+    
+    def _log_claude_event(self, event: Dict[str, Any]) -> None:
+        """Surface partial progress from the Claude event stream."""
+        # Called per streamed event; skip extracting the text unless it is shown
+        if event.get("type") == "assistant" and self.is_log_enabled("debug"):
+            text = assistant_text(event)
+            if text.strip():
+                self.log("debug", f"Claude: {text.strip()[:200]}")
+    
+    def _close_session(self) -> None:
+        """Shut down the Claude sessions and their event loop."""
+        if self._loop is None:
+            return
         
-        if self.target_files:
-            files_str = ", ".join(self.target_files)
-            file_instruction = f"Focus on these files: {files_str}"
-        else:
-            file_instruction = "Review all relevant code files in the project"
-        
-        prompt = f"""
-        Perform a comprehensive code review focusing on: {criteria_str}
-        
-        {file_instruction}
-        
-        Please provide your response in JSON format with:
-        {{
-            "issues_found": [
-                {{"file": "filename", "line": 123, "issue": "description", "severity": "high|medium|low"}}
-            ],
-            "suggestions": [
-                {{"category": "performance", "suggestion": "description", "files": ["file1", "file2"]}}
-            ],
-            "quality_score": 7.5,
-            "files_reviewed": ["file1.py", "file2.js"],
-            "summary": "Overall review summary"
-        }}
-        
-        Focus on identifying specific, actionable improvements.
-        """
+        async def close_all() -> None:
+            await asyncio.gather(*(session.close() for session in self._sessions))
+        
+        self._loop.run_until_complete(close_all())
+        self._loop.close()
+        self._loop = None
+    
+    @staticmethod
+    def _merge_review_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine per-shard review results; the quality score is the worst shard's."""
+        if len(results) == 1:
+            return results[0]
         
-        return prompt
+        return {
+            "issues_found": [issue for r in results for issue in r.get("issues_found", [])],
+            "suggestions": [suggestion for r in results for suggestion in r.get("suggestions", [])],
+            "quality_score": min(r.get("quality_score", 0) for r in results),
+            "files_reviewed": [f for r in results for f in r.get("files_reviewed", [])],
+            "summary": "\n".join(r["summary"] for r in results if r.get("summary"))
+        }
     
     def _parse_review_response(self, response: str) -> Dict[str, Any]:
         """Parse Claude's review response."""
-        try:
-            # Try to parse as JSON directly
-            return json.loads(response.strip())
-        except json.JSONDecodeError:
-            # Try to extract JSON from the response
-            import re
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                try:
-                    return json.loads(json_match.group())
-                except json.JSONDecodeError:
-                    pass
-            
-            # Fallback to basic parsing
-            return {
-                "issues_found": [],
-                "suggestions": [],
-                "quality_score": 5.0,
-                "files_reviewed": [],
-                "summary": "Failed to parse detailed review results"
-            }
+        review_result = decode_json_object(response)
+        if review_result is not None:
+            return review_result
+        
+        # Fallback to basic parsing
+        return {
+            "issues_found": [],
+            "suggestions": [],
+            "quality_score": 5.0,
+            "files_reviewed": [],
+            "summary": "Failed to parse detailed review results"
+        }
     
-    def _attempt_fixes(self, issues: list) -> None:
-        """Attempt to automatically fix found issues."""
+    async def _attempt_fixes(self, issues: list) -> None:
+        """
+        Attempt to automatically fix found issues.
+        
+        Each file's issues are fixed together by one Claude call, so no two
+        calls ever edit the same file; different files are fixed concurrently.
+        """
         self.log("info", f"Attempting to fix {len(issues)} issues")
         
+        semaphore = asyncio.Semaphore(self.max_parallel_fixes)
+        
+        async def fix_file(path: Optional[str], file_issues: List[Dict[str, Any]]) -> None:
+            issue_list = "\n".join(
+                f"            {i}. Line {issue.get('line')}: {issue.get('issue')}"
+                for i, issue in enumerate(file_issues, 1)
+            )
+            fix_prompt = f"""
+            Fix these code issues, one after another:
+            File: {path}
+{issue_list}
+            
+            Please make the necessary changes to fix each issue.
+            """
+            
+            async with semaphore:
+                returncode, _, stderr = await run_claude([
+                    '--model', self.fix_model,
+                    '--allowedTools', ','.join(FIX_TOOLS),
+                    '--permission-mode', 'acceptEdits',
+                    '-p', fix_prompt
+                ], timeout=self.claude_timeout)
+            
+            if returncode != 0:
+                raise RuntimeError(f"exit code {returncode}: {stderr.strip()}")
+        
+        by_file: Dict[Optional[str], List[Dict[str, Any]]] = {}
         for issue in issues:
-            if issue.get("severity") in ["high", "medium"]:
-                fix_prompt = f"""
-                Fix this code issue:
-                File: {issue.get('file')}
-                Line: {issue.get('line')}
-                Issue: {issue.get('issue')}
-                
-                Please make the necessary changes to fix this issue.
-                """
-                
-                try:
-                    subprocess.run([
-                        'claude',
-                        '--dangerously-skip-permissions',
-                        '-p', fix_prompt
-                    ], check=True, capture_output=True)
-                    
-                    self.log("info", f"Fixed issue in {issue.get('file')}")
-                except subprocess.CalledProcessError as e:
-                    self.log("warning", f"Failed to fix issue in {issue.get('file')}: {e}")
+            if issue.get("severity") in _FIX_SEVERITIES:
+                by_file.setdefault(issue.get("file"), []).append(issue)
+        results = await asyncio.gather(
+            *(fix_file(path, file_issues) for path, file_issues in by_file.items()),
+            return_exceptions=True
+        )
+        
+        for (path, file_issues), result in zip(by_file.items(), results):
+            if isinstance(result, BaseException):
+                self.log("warning", f"Failed to fix {len(file_issues)} issue(s) in {path}: {result}")
+            else:
+                self.log("info", f"Fixed {len(file_issues)} issue(s) in {path}")
     
     def finalize(self, state: AgentState) -> Dict[str, Any]:
         """Finalize the code review."""
         final_results = super().finalize(state)
+        self._close_session()
         
         final_results.update({
             "total_issues_found": len(self.issues_found),
             "review_criteria": self.review_criteria,
             "fix_mode_enabled": self.fix_issues,
-            "files_reviewed": list(set(self.reviewed_files))
+            "files_reviewed": list(self.reviewed_files)
         })
         
         return final_results
\ No newline at end of file
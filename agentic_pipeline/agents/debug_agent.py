@@ -1,13 +1,14 @@
 """Debug Agent - Performs iterative debugging workflows."""
 
-import subprocess
-import json
-import re
+import asyncio
+import shlex
 from typing import Any, Dict, List
 
 from ..core.agent import Agent, AgentResult, AgentStatus
 from ..core.state import AgentState
 from ..core.config import AgentConfig
+from ..parsers.json_parsers import decode_json_object
+from ..utils.claude_cli import ClaudeSession, assistant_text, run_process
 
 
 class DebugAgent(Agent):
@@ -44,6 +45,12 @@ class DebugAgent(Agent):
             "type": "string",
             "required": False,
             "description": "Debug approach: 'systematic', 'bisect', 'hypothesis'"
+        },
+        "claude_timeout": {
+            "type": "integer",
+            "required": False,
+            "default": 300,
+            "description": "Seconds to wait for Claude per iteration before failing (default: 300)"
         }
     }
     
@@ -54,9 +61,15 @@ class DebugAgent(Agent):
         self.reproduction_steps = []
         self.test_command = None
         self.debug_mode = "systematic"
+        self.claude_timeout = 300
         self.hypotheses = []
         self.tests_performed = []
         self.solutions_attempted = []
+        self._successful_solutions = 0
+        self._successful_tests = 0
+        self._prompt_prefix = ""
+        self._loop = None
+        self._session = None
     
     def initialize(self, context: Dict[str, Any]) -> None:
         """Initialize the Debug agent."""
@@ -67,15 +80,40 @@ class DebugAgent(Agent):
         self.reproduction_steps = self.config.get_parameter("reproduction_steps", [])
         self.test_command = self.config.get_parameter("test_command")
         self.debug_mode = self.config.get_parameter("debug_mode", "systematic")
+        self.claude_timeout = self.config.get_parameter("claude_timeout", 300)
         
         if not self.error_description:
             raise ValueError("Debug Agent requires 'error_description' parameter")
         
+        # The invariant part of the prompt is built once and sent as the system
+        # prompt, so iterations 2..N hit the prompt cache for it
+        self._prompt_prefix = self._build_prompt_prefix()
+        
+        # One event loop and Claude session for the whole run, so the session
+        # (and its prompt cache) persists across iterations
+        self._loop = asyncio.new_event_loop()
+        self._session = ClaudeSession(system_prompt=self._prompt_prefix)
+        
         self.status = AgentStatus.RUNNING
         self.log("info", f"Debug Agent initialized for issue: {self.error_description}")
     
     def execute_iteration(self, state: AgentState) -> AgentResult:
         """Execute one debugging iteration."""
+        return self._loop.run_until_complete(self.execute_iteration_async(state))
+    
+    async def execute_iteration_async(self, state: AgentState) -> AgentResult:
+        """Execute one debugging iteration without blocking the event loop."""
+        # The previous iteration already reached a terminal result; don't spend
+        # another Claude roundtrip confirming it
+        if self.check_terminal_condition(state):
+            self.status = AgentStatus.COMPLETED
+            return AgentResult(
+                status=self.status,
+                message="Already terminal, skipping Claude call",
+                data=state.data,
+                terminal=True
+            )
+        
         iteration_num = state.iteration + 1
         self.log("info", f"Executing debug iteration {iteration_num}")
         
@@ -83,28 +121,14 @@ class DebugAgent(Agent):
             # Build debugging prompt based on current state
             debug_prompt = self._build_debug_prompt(state, iteration_num)
             
-            # Execute Claude command for debugging
-            cmd = [
-                'claude',
-                '--output-format', 'json',
-                '--dangerously-skip-permissions',
-                '-p', debug_prompt
-            ]
-            
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
+            # Execute Claude for debugging
+            final_event = await asyncio.wait_for(
+                self._session.ask(debug_prompt, on_event=self._log_claude_event),
+                timeout=self.claude_timeout
             )
             
-            stdout, stderr = process.communicate()
-            
-            if stderr:
-                self.log("warning", f"Claude stderr: {stderr}")
-            
             # Parse debugging response
-            debug_result = self._parse_debug_response(stdout)
+            debug_result = self._parse_debug_response(final_event.get("result", "") if final_event else "")
             
             # Process debugging results
             analysis = debug_result.get("analysis", "")
@@ -119,22 +143,26 @@ class DebugAgent(Agent):
             # Test the solution if provided
             solution_works = False
             if solution:
-                solution_works = self._test_solution(solution)
+                solution_works = await self._test_solution(solution)
                 self.solutions_attempted.append({
                     "solution": solution,
                     "works": solution_works,
                     "iteration": iteration_num
                 })
+                if solution_works:
+                    self._successful_solutions += 1
             
             # Run test command if available
             test_passed = False
             if self.test_command:
-                test_passed = self._run_test_command()
+                test_passed = await self._run_test_command()
                 self.tests_performed.append({
                     "command": self.test_command,
                     "passed": test_passed,
                     "iteration": iteration_num
                 })
+                if test_passed:
+                    self._successful_tests += 1
             
             # Determine if debugging is complete
             is_complete = (
@@ -170,6 +198,16 @@ class DebugAgent(Agent):
                 terminal=is_complete
             )
         
+        except asyncio.TimeoutError:
+            self.log("error", f"Claude did not respond within {self.claude_timeout}s")
+            return AgentResult(
+                status=AgentStatus.FAILED,
+                message=f"Debug iteration timed out after {self.claude_timeout}s",
+                data={},
+                terminal=True,
+                error=f"Claude timed out after {self.claude_timeout}s"
+            )
+        
         except Exception as e:
             self.log("error", f"Debug iteration failed: {e}")
             return AgentResult(
@@ -189,38 +227,20 @@ class DebugAgent(Agent):
                    latest_data.get("test_passed", False))
         return False
     
-    def _build_debug_prompt(self, state: AgentState, iteration: int) -> str:
-        """Build the debugging prompt for Claude."""
-        
-        # Build context from previous iterations
-        context = []
-        if self.hypotheses:
-            context.append(f"Previous hypotheses tested: {'; '.join(self.hypotheses[-3:])}")
-        
-        if self.solutions_attempted:
-            recent_attempts = [
-                f"Iteration {s['iteration']}: {s['solution'][:100]} ({'worked' if s['works'] else 'failed'})"
-                for s in self.solutions_attempted[-2:]
-            ]
-            context.append(f"Recent solution attempts: {'; '.join(recent_attempts)}")
-        
-        context_str = "\n".join(context) if context else "This is the first debugging iteration."
-        
+    def _build_prompt_prefix(self) -> str:
+        """Build the invariant debugging instructions shared by every iteration."""
         reproduction_str = ""
         if self.reproduction_steps:
             reproduction_str = f"Reproduction steps: {'; '.join(self.reproduction_steps)}"
         
-        prompt = f"""
-        DEBUG SESSION - Iteration {iteration}
+        return f"""
+        DEBUG SESSION
         
         Error/Issue: {self.error_description}
         {reproduction_str}
         Debug Mode: {self.debug_mode}
         
-        CONTEXT FROM PREVIOUS ITERATIONS:
-        {context_str}
-        
-        Please analyze this issue systematically and provide a JSON response with:
+        For each iteration, analyze this issue systematically and provide a JSON response with:
         {{
             "analysis": "Detailed analysis of the current state and findings",
             "hypothesis": "Current hypothesis about the root cause",
@@ -236,34 +256,68 @@ class DebugAgent(Agent):
         3. Building on previous iterations
         4. Being systematic in your approach
         """
+    
+    def _build_debug_prompt(self, state: AgentState, iteration: int) -> str:
+        """Build the per-iteration part of the debugging prompt for Claude."""
+        
+        # Build context from previous iterations
+        context = []
+        if self.hypotheses:
+            context.append(f"Previous hypotheses tested: {'; '.join(self.hypotheses[-3:])}")
+        
+        if self.solutions_attempted:
+            recent_attempts = [
+                f"Iteration {s['iteration']}: {s['solution'][:100]} ({'worked' if s['works'] else 'failed'})"
+                for s in self.solutions_attempted[-2:]
+            ]
+            context.append(f"Recent solution attempts: {'; '.join(recent_attempts)}")
+        
+        context_str = "\n".join(context) if context else "This is the first debugging iteration."
+        
+        prompt = f"""
+        DEBUG SESSION - Iteration {iteration}
+        
+        CONTEXT FROM PREVIOUS ITERATIONS:
+        {context_str}
+        
+        Respond with the JSON object described in your instructions.
+        """
         
         return prompt
     
+    def _log_claude_event(self, event: Dict[str, Any]) -> None:
+        """Surface partial progress from the Claude event stream."""
+        # Called per streamed event; skip extracting the text unless it is shown
+        if event.get("type") == "assistant" and self.is_log_enabled("debug"):
+            text = assistant_text(event)
+            if text.strip():
+                self.log("debug", f"Claude: {text.strip()[:200]}")
+    
+    def _close_session(self) -> None:
+        """Shut down the Claude session and its event loop."""
+        if self._loop is None:
+            return
+        self._loop.run_until_complete(self._session.close())
+        self._loop.close()
+        self._loop = None
+    
     def _parse_debug_response(self, response: str) -> Dict[str, Any]:
         """Parse Claude's debugging response."""
-        try:
-            # Try to parse as JSON directly
-            return json.loads(response.strip())
-        except json.JSONDecodeError:
-            # Try to extract JSON from the response
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                try:
-                    return json.loads(json_match.group())
-                except json.JSONDecodeError:
-                    pass
-            
-            # Fallback to basic parsing
-            return {
-                "analysis": response,
-                "hypothesis": "Unable to parse structured response",
-                "solution": "",
-                "confidence": 0.3,
-                "debug_approach": "Manual analysis required",
-                "next_steps": "Review the full response manually"
-            }
+        debug_result = decode_json_object(response)
+        if debug_result is not None:
+            return debug_result
+        
+        # Fallback to basic parsing
+        return {
+            "analysis": response,
+            "hypothesis": "Unable to parse structured response",
+            "solution": "",
+            "confidence": 0.3,
+            "debug_approach": "Manual analysis required",
+            "next_steps": "Review the full response manually"
+        }
     
-    def _test_solution(self, solution: str) -> bool:
+    async def _test_solution(self, solution: str) -> bool:
         """Test if a proposed solution works."""
         self.log("info", f"Testing solution: {solution[:100]}...")
         
@@ -272,13 +326,8 @@ class DebugAgent(Agent):
         try:
             # For now, just execute the solution as a command
             if solution.startswith(('git ', 'python ', 'npm ', 'pip ')):
-                result = subprocess.run(
-                    solution.split(),
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-                return result.returncode == 0
+                returncode, _, _ = await run_process(shlex.split(solution), timeout=30)
+                return returncode == 0
             else:
                 # If it's not a command, assume it's code changes
                 # In a real implementation, this would apply the changes
@@ -288,17 +337,12 @@ class DebugAgent(Agent):
             self.log("warning", f"Solution test failed: {e}")
             return False
     
-    def _run_test_command(self) -> bool:
+    async def _run_test_command(self) -> bool:
         """Run the test command to check if issue is fixed."""
         try:
             self.log("info", f"Running test command: {self.test_command}")
-            result = subprocess.run(
-                self.test_command.split(),
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
-            passed = result.returncode == 0
+            returncode, _, _ = await run_process(shlex.split(self.test_command), timeout=60)
+            passed = returncode == 0
             self.log("info", f"Test {'passed' if passed else 'failed'}")
             return passed
         except Exception as e:
@@ -308,21 +352,18 @@ class DebugAgent(Agent):
     def finalize(self, state: AgentState) -> Dict[str, Any]:
         """Finalize the debugging session."""
         final_results = super().finalize(state)
-        
-        # Determine final status
-        successful_solutions = [s for s in self.solutions_attempted if s["works"]]
-        successful_tests = [t for t in self.tests_performed if t["passed"]]
+        self._close_session()
         
         final_results.update({
             "error_description": self.error_description,
             "debug_mode": self.debug_mode,
             "total_hypotheses": len(self.hypotheses),
             "total_solutions_attempted": len(self.solutions_attempted),
-            "successful_solutions": len(successful_solutions),
+            "successful_solutions": self._successful_solutions,
             "total_tests_run": len(self.tests_performed),
-            "successful_tests": len(successful_tests),
+            "successful_tests": self._successful_tests,
             "final_hypothesis": self.hypotheses[-1] if self.hypotheses else None,
-            "debugging_successful": len(successful_solutions) > 0 or len(successful_tests) > 0
+            "debugging_successful": self._successful_solutions > 0 or self._successful_tests > 0
         })
         
         return final_results
\ No newline at end of file
@@ -1,8 +1,13 @@
 """Planning Agent - Converts markdown specifications to Azure DevOps work items."""
 
+import asyncio
+import functools
+import hashlib
 import json
-import subprocess
-from typing import Any, Dict, List
+import os
+import tempfile
+from html import escape
+from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 
 from ..core.agent import Agent, AgentResult, AgentStatus
@@ -11,8 +16,38 @@ from ..core.config import AgentConfig
 
 from ..utils.logger import Logger
 from ..utils.usage_parser import UsageLimitParser
-from ..tdd_core.planning_session_manager import PlanningSessionManager
+from ..utils.json_codec import dumps_canonical
 from ..tdd_core.config import Configuration
+import sys
+# Add config directory to path for imports
+config_dir = Path(__file__).parent.parent.parent / "config"
+sys.path.insert(0, str(config_dir))
+from settings_manager import get_settings
+
+
+# Temporary ID used to reference the PBI from its Tasks within one batch
+PBI_TEMP_ID = -1
+
+# Spec analyses are cached here, keyed by the SHA-256 of the spec content, the
+# analysis prompts and the planning settings (see PlanningAgent.initialize)
+ANALYSIS_CACHE_DIR = Path.home() / ".cache" / "agentic_pipeline" / "planning"
+
+
+@functools.lru_cache(maxsize=512)
+def _bullet_list(items: Tuple[str, ...]) -> str:
+    """Format items as an escaped HTML bullet list; cached since specs repeat many items."""
+    if not items:
+        return "<ul></ul>"
+    # Joining the escaped items on the tag boundary skips one temporary
+    # f-string per item, which matters for lists with hundreds of entries
+    return "<ul><li>" + "</li><li>".join(map(escape, items)) + "</li></ul>"
+
+
+def _labelled_bullets(label: str, items: List[str]) -> str:
+    """Format a bold label followed by a bullet list, or nothing if there are no items."""
+    if not items:
+        return ""
+    return f"<p><strong>{label}:</strong></p>{_bullet_list(tuple(map(str, items)))}"
 
 
 class PlanningAgent(Agent):
@@ -59,6 +94,11 @@ class PlanningAgent(Agent):
             "type": "string",
             "required": False,
             "description": "Iteration path for work items"
+        },
+        "force_reanalyze": {
+            "type": "boolean",
+            "required": False,
+            "description": "Re-run spec analysis even if a cached result exists for identical content"
         }
     }
     
@@ -71,6 +111,9 @@ class PlanningAgent(Agent):
         self.usage_parser = None
         self.session_manager = None
         self.planning_config = None
+        self.azure_client = None
+        self._loop = None
+        self._path_operations = ()
         
         # Configuration parameters
         self.spec_file = config.get_parameter("spec_file")
@@ -79,32 +122,83 @@ class PlanningAgent(Agent):
         self.parent_id = config.get_parameter("parent_id")
         self.area_path = config.get_parameter("area_path")
         self.iteration_path = config.get_parameter("iteration_path")
+        self.force_reanalyze = config.get_parameter("force_reanalyze", False)
         
         # State tracking
         self.spec_content = ""
+        self.analysis_key = ""
         self.work_breakdown = {}
         self.created_work_items = []
     
+    @classmethod
+    async def plan_many(
+        cls,
+        configs: List[AgentConfig],
+        concurrency: int = 4,
+        logger: Optional[Logger] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Plan several specifications concurrently.
+        
+        Each config gets its own agent and pipeline run in a worker thread (agents
+        own their event loop and Claude/Azure sessions), with at most
+        ``concurrency`` running at once to stay within Azure DevOps rate limits.
+        
+        Args:
+            configs: One planning agent configuration per specification
+            concurrency: Maximum number of specifications planned at the same time
+            logger: Optional logger shared by all pipelines
+            
+        Returns:
+            Pipeline results, in the same order as ``configs``
+        """
+        from ..core.pipeline import AgentPipeline
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def plan_one(config: AgentConfig) -> Dict[str, Any]:
+            async with semaphore:
+                pipeline = AgentPipeline(cls(config), logger)
+                return await asyncio.to_thread(pipeline.run)
+        
+        return await asyncio.gather(*(plan_one(config) for config in configs))
+    
     def initialize(self, context: Dict[str, Any]) -> None:
         """Initialize the planning agent."""
         self.log("info", "Initializing Planning Agent")
         
-        # Validate required parameters
-        if not self.spec_file or not self.project_name or not self.organization:
-            raise ValueError("Planning Agent requires 'spec_file', 'project_name', and 'organization' parameters")
+        # Validate required parameters, reporting every missing one at once
+        missing = [
+            name for name, value in (
+                ("spec_file", self.spec_file),
+                ("project_name", self.project_name),
+                ("organization", self.organization)
+            )
+            if not value
+        ]
+        if missing:
+            raise ValueError(f"Planning Agent requires parameters: {', '.join(missing)}")
         
-        # Load specification file
+        # Load specification file. One size-hinted read with no separate exists()
+        # stat; hash the raw bytes rather than re-encoding the text (the hash
+        # becomes the analysis cache key once the prompts are known, below)
         spec_path = Path(self.spec_file)
-        if not spec_path.exists():
-            raise FileNotFoundError(f"Specification file not found: {spec_path}")
-        
-        with open(spec_path, 'r', encoding='utf-8') as f:
-            self.spec_content = f.read()
+        try:
+            spec_bytes = spec_path.read_bytes()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Specification file not found: {spec_path}") from None
+        analysis_hash = hashlib.sha256(spec_bytes)
+        self.spec_content = spec_bytes.decode('utf-8')
         
         self.log("info", f"Loaded specification from: {spec_path}")
         
+        # The Claude SDK and HTTP stacks are imported here rather than at module
+        # level, so agent discovery can import this module without paying for them
+        from ..services.azure_devops_client import AzureDevOpsClient
+        from ..tdd_core.planning_session_manager import PlanningSessionManager
+        
         # Setup planning infrastructure
-        self.logger = Logger()
+        self.logger = Logger(get_settings().get('logging.level', 'info'))
         self.usage_parser = UsageLimitParser()
         
         # Create planning configuration
@@ -118,6 +212,35 @@ class PlanningAgent(Agent):
             self.usage_parser
         )
         
+        # A cached analysis is only reused if it was made from the same spec,
+        # prompts and planning settings as this run would send
+        analysis_hash.update(dumps_canonical({
+            "prompts": self.session_manager.analysis_prompt_templates(),
+            "planning_settings": get_settings().get_planning_config()
+        }))
+        self.analysis_key = analysis_hash.hexdigest()
+        
+        # One authenticated Azure DevOps session (and the event loop it is bound
+        # to) for the whole planning run
+        self._loop = asyncio.new_event_loop()
+        self.azure_client = AzureDevOpsClient(self.organization, self.project_name)
+        
+        # Area and iteration path are the same for every work item; build their
+        # patch operations once and share them across all documents
+        self._path_operations = tuple(AzureDevOpsClient.field_operations({
+            "System.AreaPath": self.area_path,
+            "System.IterationPath": self.iteration_path
+        }))
+        
+        # Analyze the specification once, up front. Iterations only create work
+        # items, so a repeated or retried iteration can never re-bill Claude
+        try:
+            self.work_breakdown = self._load_or_analyze_specification()
+        except BaseException:
+            # AgentPipeline.run never finalizes an agent whose initialize failed
+            self._close_azure_client()
+            raise
+        
         self.status = AgentStatus.RUNNING
         self.log("info", "Planning Agent initialization completed")
     
@@ -128,8 +251,8 @@ class PlanningAgent(Agent):
         
         try:
             if iteration_num == 1:
-                # Single iteration: analyze specification and create work items
-                return self._analyze_and_create_work_items(state)
+                # Single iteration: create work items from the analysis done in initialize
+                return self._create_work_items(state)
             else:
                 # Should be terminal after first iteration
                 return AgentResult(
@@ -157,6 +280,8 @@ class PlanningAgent(Agent):
     def finalize(self, state: AgentState) -> Dict[str, Any]:
         """Finalize and return summary."""
         base_result = super().finalize(state)
+        self._close_azure_client()
+        
         base_result.update({
             "created_work_items": self.created_work_items,
             "work_breakdown": self.work_breakdown,
@@ -164,13 +289,23 @@ class PlanningAgent(Agent):
         })
         return base_result
     
-    def _analyze_and_create_work_items(self, state: AgentState) -> AgentResult:
-        """Analyze specification and create Azure DevOps work items."""
-        self.log("info", "Analyzing specification with Claude SDK...")
+    def _load_or_analyze_specification(self) -> Optional[Dict[str, Any]]:
+        """Use Claude SDK to analyze the specification, unless an analysis with identical inputs is cached."""
+        work_breakdown = None if self.force_reanalyze else self._load_cached_analysis()
         
-        # Step 1: Use Claude SDK to analyze specification
-        self.work_breakdown = self.session_manager.analyze_specification(self.spec_content)
+        if work_breakdown:
+            self.log("info", f"Using cached analysis {self.analysis_key[:12]}")
+            return work_breakdown
         
+        self.log("info", "Analyzing specification with Claude SDK...")
+        work_breakdown = self.session_manager.analyze_specification(self.spec_content)
+        if work_breakdown:
+            self._store_cached_analysis(work_breakdown)
+        return work_breakdown
+    
+    def _create_work_items(self, state: AgentState) -> AgentResult:
+        """Create Azure DevOps work items from the specification analysis."""
+        # Step 1: Analysis happened in initialize; fail if it produced nothing
         if not self.work_breakdown:
             return AgentResult(
                 status=AgentStatus.FAILED,
@@ -186,7 +321,7 @@ class PlanningAgent(Agent):
         # Step 3: Log results
         self.log("info", f"Successfully created {len(self.created_work_items)} work items")
         for item in self.created_work_items:
-            self.log("info", f"Created: {item.get('type')} #{item.get('id')} - {item.get('title')}")
+            self.log_lazy("info", "Created: %s #%s - %s", item.get('type'), item.get('id'), item.get('title'))
         
         return AgentResult(
             status=AgentStatus.COMPLETED,
@@ -199,227 +334,170 @@ class PlanningAgent(Agent):
             terminal=True
         )
     
-    def _create_azure_work_items(self, work_breakdown: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Create Azure DevOps work items from structured breakdown."""
-        created_items = []
+    def _analysis_cache_path(self) -> Path:
+        """Cache file for the current spec's analysis."""
+        return ANALYSIS_CACHE_DIR / f"{self.analysis_key}.json"
+    
+    def _load_cached_analysis(self) -> Optional[Dict[str, Any]]:
+        """Load a cached work breakdown for the current spec, if any."""
+        cache_path = self._analysis_cache_path()
+        if not cache_path.exists():
+            return None
         
         try:
-            # Step 1: Create Product Backlog Item (PBI)
-            pbi_data = work_breakdown.get("product_backlog_item", {})
-            pbi_id = self._create_pbi(pbi_data)
-            
-            if pbi_id:
-                created_items.append({
-                    "type": "Product Backlog Item",
-                    "id": pbi_id,
-                    "title": pbi_data.get("title", "")
-                })
-                
-                # Step 2: Create Task work items linked to PBI
-                tasks_data = work_breakdown.get("tasks", [])
-                for task_data in tasks_data:
-                    task_id = self._create_task(task_data, pbi_id)
-                    if task_id:
-                        created_items.append({
-                            "type": "Task",
-                            "id": task_id,
-                            "title": task_data.get("title", ""),
-                            "parent_id": pbi_id
-                        })
-            
-            return created_items
-            
-        except Exception as e:
-            self.log("error", f"Failed to create Azure DevOps work items: {e}")
-            return created_items
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            self.log("warning", f"Ignoring unreadable analysis cache {cache_path}: {e}")
+            return None
     
-    def _create_pbi(self, pbi_data: Dict[str, Any]) -> int:
-        """Create a Product Backlog Item in Azure DevOps."""
+    def _store_cached_analysis(self, work_breakdown: Dict[str, Any]) -> None:
+        """Cache a work breakdown atomically (temp file + rename)."""
         try:
-            # Build az boards command for PBI
-            cmd = [
-                "az", "boards", "work-item", "create",
-                "--type", "Product Backlog Item",
-                "--title", pbi_data.get("title", ""),
-                "--description", self._format_pbi_description(pbi_data),
-                "--project", self.project_name,
-                "--organization", self.organization
-            ]
-            
-            # Add optional fields including acceptance criteria
-            fields = []
-            
-            # Add acceptance criteria as separate field
-            if pbi_data.get("acceptance_criteria"):
-                ac_html = self._format_acceptance_criteria(pbi_data.get("acceptance_criteria"))
-                fields.append(f"Microsoft.VSTS.Common.AcceptanceCriteria={ac_html}")
-            
-            if self.area_path:
-                cmd.extend(["--area", self.area_path])
-                
-            if self.iteration_path:
-                cmd.extend(["--iteration", self.iteration_path])
-            
-            # Add fields if any
-            if fields:
-                cmd.extend(["--fields", ";".join(fields)])
-            
-            # Execute command
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            
-            # Parse work item ID from JSON response
-            work_item = json.loads(result.stdout)
-            pbi_id = work_item.get("id")
-            
-            # Link PBI to specified parent if provided
-            if pbi_id and self.parent_id:
-                self._link_task_to_parent(pbi_id, self.parent_id)
-            
-            self.log("info", f"Created PBI #{pbi_id}: {pbi_data.get('title', '')}")
-            return pbi_id
-            
-        except subprocess.CalledProcessError as e:
-            self.log("error", f"Failed to create PBI: {e.stderr}")
-            return None
-        except Exception as e:
-            self.log("error", f"Error creating PBI: {e}")
-            return None
+            ANALYSIS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=ANALYSIS_CACHE_DIR, suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(work_breakdown, f)
+            os.replace(temp_path, self._analysis_cache_path())
+        except OSError as e:
+            self.log("warning", f"Failed to cache specification analysis: {e}")
     
-    def _create_task(self, task_data: Dict[str, Any], parent_id: int) -> int:
-        """Create a Task work item in Azure DevOps."""
+    def _create_azure_work_items(self, work_breakdown: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Create Azure DevOps work items from structured breakdown."""
         try:
-            # Build az boards command for Task (without parent field)
-            cmd = [
-                "az", "boards", "work-item", "create",
-                "--type", "Task",
-                "--title", task_data.get("title", ""),
-                "--description", self._format_task_description(task_data),
-                "--project", self.project_name,
-                "--organization", self.organization
-            ]
-            
-            # Add area and iteration if specified
-            if self.area_path:
-                cmd.extend(["--area", self.area_path])
-                
-            if self.iteration_path:
-                cmd.extend(["--iteration", self.iteration_path])
-            
-            # Skip effort field for now to focus on basic functionality
-            
-            # Execute command
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            
-            # Parse work item ID from JSON response
-            work_item = json.loads(result.stdout)
-            task_id = work_item.get("id")
-            
-            # Create parent-child relationship
-            if task_id and parent_id:
-                self._link_task_to_parent(task_id, parent_id)
-            
-            self.log("info", f"Created Task #{task_id}: {task_data.get('title', '')}")
-            return task_id
-            
-        except subprocess.CalledProcessError as e:
-            self.log("error", f"Failed to create Task: {e.stderr}")
-            return None
+            return self._loop.run_until_complete(self._create_work_items_async(work_breakdown))
         except Exception as e:
-            self.log("error", f"Error creating Task: {e}")
-            return None
+            self.log("error", f"Failed to create Azure DevOps work items: {e}")
+            return []
     
-    def _link_task_to_parent(self, task_id: int, parent_id: int) -> bool:
-        """Create parent-child relationship between task and PBI."""
+    async def _create_work_items_async(self, work_breakdown: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Create the PBI and all of its Tasks, with parent links, in one ``$batch`` request."""
+        pbi_data = work_breakdown.get("product_backlog_item", {})
+        tasks_data = work_breakdown.get("tasks", [])
+        
+        # Tasks reference the PBI created in the same batch by its temporary ID
+        batch = [{
+            "type": "Product Backlog Item",
+            "fields": self._pbi_fields(pbi_data),
+            "temp_id": PBI_TEMP_ID,
+            "parent_id": self.parent_id,
+            "base_operations": self._path_operations
+        }]
+        batch.extend(
+            {
+                "type": "Task",
+                "fields": self._task_fields(task_data),
+                "parent_id": PBI_TEMP_ID,
+                "base_operations": self._path_operations
+            }
+            for task_data in tasks_data
+        )
+        
+        import httpx
+        
         try:
-            # Use az boards work-item relation add to link task to parent
-            cmd = [
-                "az", "boards", "work-item", "relation", "add",
-                "--id", str(task_id),
-                "--relation-type", "parent",
-                "--target-id", str(parent_id),
-                "--organization", self.organization
-            ]
-            
-            subprocess.run(cmd, capture_output=True, text=True, check=True)
-            self.log("info", f"Linked Task #{task_id} to Parent #{parent_id}")
-            return True
+            results = await self.azure_client.create_work_items_batch(batch)
+        except httpx.HTTPStatusError as e:
+            self.log("error", f"Failed to create work items: {e.response.text}")
+            return []
+        
+        pbi_item, task_items = results[0], results[1:]
+        if not pbi_item:
+            self.log("error", f"Failed to create PBI: {pbi_data.get('title', '')}")
+            return []
+        
+        pbi_id = pbi_item["id"]
+        self.log("info", f"Created PBI #{pbi_id}: {pbi_data.get('title', '')}")
+        created_items = [{
+            "type": "Product Backlog Item",
+            "id": pbi_id,
+            "title": pbi_data.get("title", "")
+        }]
+        
+        for task_data, task_item in zip(tasks_data, task_items):
+            if not task_item:
+                self.log("error", f"Failed to create Task: {task_data.get('title', '')}")
+                continue
             
-        except subprocess.CalledProcessError as e:
-            self.log("error", f"Failed to link Task #{task_id} to Parent #{parent_id}: {e.stderr}")
-            return False
-        except Exception as e:
-            self.log("error", f"Error linking Task to Parent: {e}")
-            return False
+            self.log("info", f"Created Task #{task_item['id']}: {task_data.get('title', '')}")
+            created_items.append({
+                "type": "Task",
+                "id": task_item["id"],
+                "title": task_data.get("title", ""),
+                "parent_id": pbi_id
+            })
+        
+        return created_items
+    
+    def _close_azure_client(self) -> None:
+        """Close the Azure DevOps session and its event loop."""
+        if self._loop is None:
+            return
+        self._loop.run_until_complete(self.azure_client.aclose())
+        self._loop.close()
+        self._loop = None
+    
+    def _pbi_fields(self, pbi_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the per-PBI field values (area/iteration are shared operations)."""
+        fields = {
+            "System.Title": pbi_data.get("title", ""),
+            "System.Description": self._format_pbi_description(pbi_data)
+        }
+        
+        # Add acceptance criteria as separate field
+        if pbi_data.get("acceptance_criteria"):
+            fields["Microsoft.VSTS.Common.AcceptanceCriteria"] = self._format_acceptance_criteria(
+                pbi_data.get("acceptance_criteria")
+            )
+        
+        return fields
+    
+    def _task_fields(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the per-Task field values (area/iteration are shared operations)."""
+        return {
+            "System.Title": task_data.get("title", ""),
+            "System.Description": self._format_task_description(task_data)
+        }
     
     def _format_pbi_description(self, pbi_data: Dict[str, Any]) -> str:
         """Format PBI description with HTML for Azure DevOps (without acceptance criteria)."""
         description = pbi_data.get("description", "")
-        
-        html_parts = []
-        
-        # Add main description only
-        if description:
-            html_parts.append(f"<h3>Problem Statement</h3>")
-            html_parts.append(f"<p>{description}</p>")
-        
-        return "".join(html_parts)
+        if not description:
+            return ""
+        return f"<h3>Problem Statement</h3><p>{escape(description)}</p>"
     
     def _format_acceptance_criteria(self, acceptance_criteria: List[str]) -> str:
         """Format acceptance criteria as HTML list for Azure DevOps AC field."""
         if not acceptance_criteria:
             return ""
-        
-        html_parts = ["<ul>"]
-        for criteria in acceptance_criteria:
-            html_parts.append(f"<li>{criteria}</li>")
-        html_parts.append("</ul>")
-        
-        return "".join(html_parts)
+        return _bullet_list(tuple(map(str, acceptance_criteria)))
     
     def _format_task_description(self, task_data: Dict[str, Any]) -> str:
         """Format Task description with BDD Given/When/Then format."""
         description = task_data.get("description", "")
+        requirements = task_data.get("requirements", [])
         given = task_data.get("given", [])
         when = task_data.get("when", [])
         then = task_data.get("then", [])
-        requirements = task_data.get("requirements", [])
         
         html_parts = []
         
         # Add task description
         if description:
-            html_parts.append(f"<p>{description}</p>")
-        
-        # Add BDD scenario
-        html_parts.append("<h4>BDD Test Scenario</h4>")
-        
-        if given:
-            html_parts.append("<p><strong>Given:</strong></p>")
-            html_parts.append("<ul>")
-            for item in given:
-                html_parts.append(f"<li>{item}</li>")
-            html_parts.append("</ul>")
-        
-        if when:
-            html_parts.append("<p><strong>When:</strong></p>")
-            html_parts.append("<ul>")
-            for item in when:
-                html_parts.append(f"<li>{item}</li>")
-            html_parts.append("</ul>")
-        
-        if then:
-            html_parts.append("<p><strong>Then:</strong></p>")
-            html_parts.append("<ul>")
-            for item in then:
-                html_parts.append(f"<li>{item}</li>")
-            html_parts.append("</ul>")
+            html_parts.append(f"<p>{escape(description)}</p>")
+        
+        # Add BDD scenario, skipped entirely for tasks without one
+        if given or when or then:
+            html_parts.append(
+                "<h4>BDD Test Scenario</h4>"
+                + _labelled_bullets("Given", given)
+                + _labelled_bullets("When", when)
+                + _labelled_bullets("Then", then)
+            )
         
         # Add implementation requirements
         if requirements:
             html_parts.append("<h4>Implementation Requirements</h4>")
-            html_parts.append("<ul>")
-            for req in requirements:
-                html_parts.append(f"<li>{req}</li>")
-            html_parts.append("</ul>")
+            html_parts.append(_bullet_list(tuple(map(str, requirements))))
         
-        return "".join(html_parts)
\ No newline at end of file
+        return "".join(html_parts)
@@ -1,7 +1,15 @@
 """TDD Agent - Refactored from the original TDD DevOps Loop."""
 
+import asyncio
+import functools
+import operator
 import os
-from typing import Any, Dict, List
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import httpx
 
 from ..core.agent import Agent, AgentResult, AgentStatus
 from ..core.state import AgentState
@@ -10,15 +18,37 @@ from ..core.config import AgentConfig
 # Import the TDD infrastructure
 from ..utils.logger import Logger
 from ..utils.usage_parser import UsageLimitParser
-from ..tdd_core.sdk_session_manager import ClaudeSDKSessionManager
 from ..tdd_core.config import Configuration
-from ..services.openai_reflection_service import OpenAIReflectionService
+from ..utils.claude_cli import run_process
 import sys
 from pathlib import Path
 # Add config directory to path for imports
 config_dir = Path(__file__).parent.parent.parent / "config"
 sys.path.insert(0, str(config_dir))
-from settings_manager import get_settings
+from settings_manager import SettingsManager, get_settings
+
+
+# First line of `git commit` output: "[<branch> <short hash>] <subject>"
+COMMIT_SUMMARY_PATTERN = re.compile(r'\[[^\]]* ([0-9a-f]{7,})\]')
+
+# Bytes read from `git diff` at a time; the diff is split into lines by hand
+# so a single huge line (e.g. a minified file) cannot overrun a line buffer
+DIFF_READ_CHUNK_SIZE = 64 * 1024
+
+# Fields read from each child task
+TASK_FIELDS = [
+    "System.Id",
+    "System.Title",
+    "System.Description",
+    "System.State",
+    "Microsoft.VSTS.Common.AcceptanceCriteria"
+]
+
+# Child tasks of a work item, in the order they are implemented
+CHILD_TASKS_WIQL = (
+    "SELECT [System.Id] FROM WorkItems WHERE [System.Parent] = {parent_id} "
+    "AND [System.WorkItemType] = 'Task' ORDER BY [System.Id]"
+)
 
 
 class TDDAgent(Agent):
@@ -69,6 +99,7 @@ class TDDAgent(Agent):
         self.session_manager = None
         self.tdd_config = None
         self.reflection_service = None
+        self._reflection_executor = None
         
         # State tracking
         self.project_path = None
@@ -77,6 +108,21 @@ class TDDAgent(Agent):
         self.max_reflection_retries = None
         self.current_tasks = []
         self.current_task_index = 0
+        # Child tasks already Done when loaded; they are left out of current_tasks
+        self.tasks_done_at_start = 0
+        self.azure_client = None
+        self._loop = None
+        # Background load of the child tasks after the first page (see initialize)
+        self._task_loader = None
+        # Refresh of the later tasks' states, run while Claude works on the current one
+        self._state_prefetch = None
+        self.state_cache_ttl = 300.0
+        self.reflection_diff_max_lines = 2000
+        self.post_rate_limit_delay = 0.0
+        # Task ID -> (time.monotonic() when observed, System.State)
+        self._state_cache: Dict[int, Tuple[float, str]] = {}
+        # (task ID, state) transitions not yet sent; see _flush_state_updates
+        self._pending_state_updates: List[Tuple[int, str]] = []
     
     def initialize(self, context: Dict[str, Any] = None) -> None:
         """Initialize the TDD agent with project context."""
@@ -87,17 +133,52 @@ class TDDAgent(Agent):
         self.work_item_id = self.config.get_parameter("work_item_id")
         self.organization = self.config.get_parameter("organization")
         
-        # Get reflection settings from config file
+        # Read settings once; the reflection and Azure DevOps setup below reuse them
         settings = get_settings()
         tdd_config = settings.get_tdd_config()
         self.max_reflection_retries = self.config.get_parameter("max_reflection_retries", 
                                                                 tdd_config.get('max_reflection_retries', 3))
+        self.state_cache_ttl = tdd_config.get('work_item_cache_ttl', 300)
+        self.reflection_diff_max_lines = tdd_config.get('reflection_diff_max_lines', 2000)
+        self.post_rate_limit_delay = tdd_config.get('post_rate_limit_delay', 0)
         
         if not self.project_path or not self.work_item_id:
             raise ValueError("TDD Agent requires 'project_path' and 'work_item_id' parameters")
         
+        # Work items are read and updated through the REST API, over one
+        # authenticated session (and the event loop it is bound to) for the whole run
+        from ..services.azure_devops_client import AzureDevOpsClient
+        
+        organization = self.organization or settings.get_azure_config().get('default_organization')
+        if not organization:
+            raise ValueError(
+                "TDD Agent requires an Azure DevOps organization: pass 'organization' "
+                "or set azure_devops.default_organization in config/settings.json"
+            )
+        self._loop = asyncio.new_event_loop()
+        self.azure_client = AzureDevOpsClient(organization)
+        try:
+            self._initialize_run(settings, tdd_config)
+        except BaseException:
+            # AgentPipeline.run never finalizes an agent whose initialize failed
+            self._close_sessions()
+            if self._reflection_executor:
+                self._reflection_executor.shutdown(wait=False)
+                self._reflection_executor = None
+            raise
+        
+        self.status = AgentStatus.RUNNING
+        self.log("info", "TDD Agent initialization completed")
+    
+    def _initialize_run(self, settings: SettingsManager, tdd_config: Dict[str, Any]) -> None:
+        """Set up the Claude and reflection sessions and load the work item's tasks."""
+        # The Claude SDK and OpenAI stacks are imported here rather than at module
+        # level, so agent discovery can import this module without paying for them
+        from ..tdd_core.sdk_session_manager import ClaudeSDKSessionManager
+        from ..services.openai_reflection_service import OpenAIReflectionService
+        
         # Setup TDD infrastructure
-        self.logger = Logger()
+        self.logger = Logger(settings.get('logging.level', 'info'))
         self.usage_parser = UsageLimitParser()
         
         # Create TDD configuration
@@ -112,9 +193,6 @@ class TDDAgent(Agent):
         )
         
         # Initialize OpenAI reflection service for quality gate
-        settings = get_settings()
-        tdd_config = settings.get_tdd_config()
-        
         if tdd_config.get('enable_reflection', True):
             try:
                 self.reflection_service = OpenAIReflectionService()
@@ -130,34 +208,72 @@ class TDDAgent(Agent):
             self.log("info", "Reflection disabled in settings - continuing without reflection")
             self.reflection_service = None
         
-        # Change to project directory
-        if os.path.exists(self.project_path):
-            os.chdir(self.project_path)
-            self.log("info", f"Changed to project directory: {self.project_path}")
-        else:
+        if self.reflection_service:
+            # Reflection runs on this worker while the agent prepares the feedback iteration
+            self._reflection_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tdd-reflection")
+        
+        # The agent never changes the process working directory; every Claude
+        # session and git command is given cwd=self.project_path explicitly, so
+        # several agents can run in one process
+        if not os.path.isdir(self.project_path):
             raise ValueError(f"Project path does not exist: {self.project_path}")
+        # Resolved once, so a relative path keeps pointing at the same
+        # directory even if something else changes the working directory
+        self.project_path = os.path.realpath(self.project_path)
         
-        # Fetch work item and its tasks
+        # Fetch work item and its tasks. The task list is rebuilt from scratch,
+        # so a re-initialized agent does not count its Done tasks twice
+        self.tasks_done_at_start = 0
+        self.current_task_index = 0
         try:
             self.log("info", f"Fetching Azure DevOps work item: {self.work_item_id}")
-            self._get_work_item_details(self.work_item_id)
-            self.current_tasks = self._get_child_tasks(self.work_item_id)
+            # The parent fetch only confirms the PBI exists; let it run on the
+            # loop while the child task query and batch fetch are in flight
+            parent_fetch = self._loop.create_task(self.azure_client.get_work_item(self.work_item_id))
+            # Only the first page of tasks is needed to start; the rest load
+            # on the loop while the first tasks are being worked on
+            task_pages = self._iter_child_tasks(self.work_item_id)
+            try:
+                self.current_tasks = self._loop.run_until_complete(anext(task_pages, []))
+            finally:
+                # A missing parent explains a failed task query, so its error wins
+                self._loop.run_until_complete(parent_fetch)
             
-            if not self.current_tasks:
+            if not self.current_tasks and not self.tasks_done_at_start:
                 raise ValueError(f"No child tasks found for work item {self.work_item_id}")
+            self._task_loader = self._loop.create_task(self._load_remaining_tasks(task_pages))
             
-            self.log("info", f"Found {len(self.current_tasks)} tasks to implement")
+            self.log("info", f"Loaded {len(self.current_tasks)} tasks to implement ({self.tasks_done_at_start} already done)")
             for i, task in enumerate(self.current_tasks, 1):
                 self.log("info", f"  {i}. Task {task['id']}: {task['title']}")
         
         except Exception as e:
             raise ValueError(f"Failed to fetch work item details: {e}")
         
-        self.status = AgentStatus.RUNNING
-        self.log("info", "TDD Agent initialization completed")
+        # One Claude Code process serves every TDD and feedback iteration of
+        # the run instead of a new one starting per iteration
+        self._loop.run_until_complete(self.session_manager.start(cwd=self.project_path))
     
     def execute_iteration(self, state: AgentState) -> AgentResult:
         """Execute one TDD iteration."""
+        iteration = self._loop.create_task(self.execute_iteration_async(state))
+        try:
+            return self._loop.run_until_complete(iteration)
+        except BaseException:
+            # Interrupted (e.g. KeyboardInterrupt): cancel the iteration so its
+            # cleanup, which sends the pending task state changes, still runs
+            if not iteration.done():
+                iteration.cancel()
+                self._loop.run_until_complete(asyncio.gather(iteration, return_exceptions=True))
+            raise
+    
+    async def execute_iteration_async(self, state: AgentState) -> AgentResult:
+        """
+        Execute one TDD iteration on the agent's event loop.
+        
+        Claude, git, Azure DevOps and reflection calls are awaited rather than
+        blocking, so the reflection round trip overlaps the agent's own work.
+        """
         iteration_num = state.iteration + 1
         self.log("info", f"Executing TDD iteration {iteration_num}")
         
@@ -165,14 +281,22 @@ class TDDAgent(Agent):
             # Log iteration header (similar to original)
             self.logger.iteration_header(iteration_num)
             
-            # Find next incomplete task
-            while self.current_task_index < len(self.current_tasks):
-                current_task = self.current_tasks[self.current_task_index]
+            # Let the refresh started last iteration land in the cache first
+            if self._state_prefetch is not None:
+                await self._state_prefetch
+                self._state_prefetch = None
+            
+            while True:
+                # Check the state of all remaining tasks in one request, instead
+                # of one per skipped task. States observed (or written) less than
+                # work_item_cache_ttl seconds ago, including those from last
+                # iteration's background refresh, are reused rather than fetched
+                fresh_states = await self._get_task_states(self.current_tasks[self.current_task_index:])
                 
-                # Check current state in Azure DevOps (not cached state)
-                try:
-                    fresh_task_details = self._get_work_item_details(current_task['id'])
-                    current_state = fresh_task_details.get('fields', {}).get('System.State', '')
+                # Find next incomplete task
+                while self.current_task_index < len(self.current_tasks):
+                    current_task = self.current_tasks[self.current_task_index]
+                    current_state = fresh_states.get(current_task['id'])
                     
                     # Skip tasks that are already completed
                     if current_state == 'Done':
@@ -180,15 +304,16 @@ class TDDAgent(Agent):
                         self.current_task_index += 1
                         continue
                     
-                    # Update local cache with current state
-                    current_task['state'] = current_state
+                    # Update local cache with current state (kept as-is if the refresh failed)
+                    if current_state:
+                        current_task['state'] = current_state
                     
-                except Exception as e:
-                    self.log("warning", f"Could not check current state of task {current_task['id']}: {e}")
-                    # Continue with cached state if API call fails
+                    # Found an incomplete task
+                    break
                 
-                # Found an incomplete task
-                break
+                # Every loaded task is done; look through any still loading
+                if self.current_task_index < len(self.current_tasks) or not await self._finish_loading_tasks():
+                    break
             
             # Check if all tasks are completed
             if self.current_task_index >= len(self.current_tasks):
@@ -196,7 +321,7 @@ class TDDAgent(Agent):
                 return AgentResult(
                     status=AgentStatus.COMPLETED,
                     message="All TDD tasks completed successfully",
-                    data={"completed_tasks": len(self.current_tasks)},
+                    data={"completed_tasks": len(self.current_tasks) + self.tasks_done_at_start},
                     terminal=True
                 )
             
@@ -204,45 +329,44 @@ class TDDAgent(Agent):
             current_task = self.current_tasks[self.current_task_index]
             task_progress = f"{self.current_task_index + 1}/{len(self.current_tasks)}"
             
-            self.log("info", "")
-            self.log("info", "=" * 60)
-            self.log("info", f"🎯 STARTING TASK {task_progress}: {current_task['id']}")
-            self.log("info", f"📝 Title: {current_task['title']}")
-            self.log("info", f"📋 State: {current_task.get('state', 'Unknown')}")
-            self.log("info", "=" * 60)
-            
-            # Mark task as "In Progress" when starting work
+            # Banners are logged as one multi-line message, built only if shown
+            if self.is_log_enabled("info"):
+                self.log("info", "\n".join([
+                    "",
+                    "=" * 60,
+                    f"🎯 STARTING TASK {task_progress}: {current_task['id']}",
+                    f"📝 Title: {current_task['title']}",
+                    f"📋 State: {current_task.get('state', 'Unknown')}",
+                    "=" * 60
+                ]))
+            
+            # Mark task as "In Progress" when starting work, before Claude starts
             if current_task.get('state') not in ['In Progress', 'Done']:
                 self.log("info", f"🔄 Marking task as In Progress...")
-                self._update_task_status(current_task['id'], "In Progress")
+                self._pending_state_updates.append((current_task['id'], "In Progress"))
                 current_task['state'] = 'In Progress'  # Update local state
+            # Refresh the later tasks' states in the background, so the next
+            # iteration's scan finds them cached
+            self._state_prefetch = self._loop.create_task(
+                self._get_task_states(self.current_tasks[self.current_task_index + 1:])
+            )
+            await self._flush_state_updates()
             
             # TDD iteration with reflection loop
-            task_completed = self._execute_tdd_with_reflection(current_task)
+            task_completed = await self._execute_tdd_with_reflection(current_task)
             
             if not task_completed:
                 # If we couldn't complete the task after max retries, log and continue
                 self.log("warning", f"Task {current_task['id']} could not be completed after maximum reflection retries - moving to next task")
             
-            # Mark current task as done in Azure DevOps
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    if self._update_task_status(current_task['id'], "Done"):
-                        break
-                    else:
-                        self.log("warning", f"Failed to update task status (attempt {attempt + 1}/{max_retries})")
-                        if attempt < max_retries - 1:
-                            import time
-                            time.sleep(1)  # Brief delay before retry
-                except Exception as e:
-                    self.log("error", f"Error updating task status (attempt {attempt + 1}/{max_retries}): {e}")
-                    if attempt == max_retries - 1:
-                        self.log("error", f"Failed to update task {current_task['id']} status after {max_retries} attempts")
+            # Mark current task as done in Azure DevOps when the iteration ends
+            self._pending_state_updates.append((current_task['id'], "Done"))
             
             # Log task completion and move to next task
             self.log("info", f"✅ TASK {current_task['id']} COMPLETED")
             self.current_task_index += 1
+            if self.current_task_index >= len(self.current_tasks):
+                await self._finish_loading_tasks()
             
             # Check if all tasks are done
             if self.current_task_index >= len(self.current_tasks):
@@ -281,9 +405,18 @@ class TDDAgent(Agent):
                 terminal=True,
                 error=str(e)
             )
+        finally:
+            # Every iteration ends with its state changes sent, so a run that stops
+            # before the next iteration (error, max_iterations, interrupt) leaves
+            # no finished task "In Progress"
+            await self._flush_state_updates()
     
     def check_terminal_condition(self, state: AgentState) -> bool:
         """Check if TDD work should terminate."""
+        # The last iteration finished every task
+        if self.status == AgentStatus.COMPLETED:
+            return True
+        
         # Check if the TDD work was marked as complete
         latest_result = state.get("iteration_result")
         if latest_result and latest_result.get('complete', False):
@@ -298,6 +431,12 @@ class TDDAgent(Agent):
         
         # Get base finalization data
         final_results = super().finalize(state)
+        if self._loop is not None:
+            self._loop.run_until_complete(self._flush_state_updates())
+        self._close_sessions()
+        if self._reflection_executor:
+            self._reflection_executor.shutdown(wait=False)
+            self._reflection_executor = None
         
         # Add TDD-specific results
         final_results.update({
@@ -305,8 +444,8 @@ class TDDAgent(Agent):
             "work_item_id": self.work_item_id,
             "tdd_iterations": self.iteration_count,
             "final_tdd_status": self.status.value,
-            "total_tasks": len(self.current_tasks),
-            "completed_tasks": self.current_task_index
+            "total_tasks": len(self.current_tasks) + self.tasks_done_at_start,
+            "completed_tasks": self.current_task_index + self.tasks_done_at_start
         })
         
         # Include final iteration result if available
@@ -321,48 +460,52 @@ class TDDAgent(Agent):
         """Hook called before each TDD iteration."""
         # Log current state
         iteration_num = state.iteration + 1
-        self.log("debug", f"Starting TDD iteration {iteration_num}")
+        self.log_lazy("debug", "Starting TDD iteration %d", iteration_num)
     
     def post_iteration_hook(self, state: AgentState, result: AgentResult) -> None:
         """Hook called after each TDD iteration."""
         # Log iteration completion
-        self.log("debug", f"Completed TDD iteration {state.iteration}")
+        self.log_lazy("debug", "Completed TDD iteration %d", state.iteration)
         
         # Log any warnings or errors
         if result.error:
             self.log("warning", f"Iteration had error: {result.error}")
     
-    def _execute_tdd_with_reflection(self, current_task: Dict[str, Any]) -> bool:
+    async def _execute_tdd_with_reflection(self, current_task: Dict[str, Any]) -> bool:
         """Execute TDD with OpenAI reflection quality gate."""
         retry_count = 0
         task_id = current_task['id']
         task_title = current_task.get('title', 'Unknown Task')
         
-        self.log("info", "")
-        self.log("info", "=" * 80)
-        self.log("info", f"🎯 STARTING TDD + REFLECTION LOOP FOR TASK {task_id}")
-        self.log("info", f"📋 Task: {task_title}")
-        self.log("info", f"🔄 Max Attempts: {self.max_reflection_retries}")
-        self.log("info", "=" * 80)
+        if self.is_log_enabled("info"):
+            self.log("info", "\n".join([
+                "",
+                "=" * 80,
+                f"🎯 STARTING TDD + REFLECTION LOOP FOR TASK {task_id}",
+                f"📋 Task: {task_title}",
+                f"🔄 Max Attempts: {self.max_reflection_retries}",
+                "=" * 80
+            ]))
         
         while retry_count < self.max_reflection_retries:
             attempt_num = retry_count + 1
-            self.log("info", "")
-            self.log("info", f"🔄 ATTEMPT {attempt_num}/{self.max_reflection_retries} - TDD ITERATION")
-            self.log("info", "-" * 50)
+            if self.is_log_enabled("info"):
+                self.log("info", "\n".join([
+                    "",
+                    f"🔄 ATTEMPT {attempt_num}/{self.max_reflection_retries} - TDD ITERATION",
+                    "-" * 50
+                ]))
             
             # Run TDD iteration using session manager with task details
             self.log("info", f"🤖 Running Claude Code SDK TDD iteration...")
-            usage_limit_epoch, return_code = self.session_manager.run_single_iteration(
-                current_task
+            usage_limit_epoch, return_code = await self.session_manager.run_single_iteration_async(
+                current_task, cwd=self.project_path
             )
             
             # Handle usage limits
             if usage_limit_epoch:
                 self.log("warning", "⏱️  Claude usage limit detected - waiting for reset")
-                self.usage_parser.sleep_until_reset(usage_limit_epoch, self.logger)
-                import time
-                time.sleep(2)
+                await self._wait_for_usage_reset(usage_limit_epoch)
             
             # Process return code
             if return_code != 0:
@@ -370,26 +513,23 @@ class TDDAgent(Agent):
             else:
                 self.log("info", f"✅ TDD iteration completed successfully")
             
-            # Get current uncommitted changes
+            # Check for uncommitted changes without reading the diff itself
             self.log("info", f"📊 Checking for working changes...")
-            current_diff = self._get_git_working_changes()
-            
-            if not current_diff or len(current_diff.strip()) == 0:
+            if not await self._has_git_working_changes():
                 self.log("info", f"📭 No working changes detected - accepting iteration")
                 self.log("info", f"✅ TASK {task_id} COMPLETED (no changes needed)")
                 return True
             
-            change_size = len(current_diff)
-            lines_changed = current_diff.count('\n')
-            self.log("info", f"📏 Working changes detected: {change_size} chars, {lines_changed} lines")
-            
             # Skip reflection if no reflection service available
             if not self.reflection_service:
                 self.log("warning", f"⚠️  No reflection service available - auto-approving changes")
-                self._commit_changes(f"Task {task_id}: TDD iteration completed (no reflection)")
+                await self._commit_changes(f"Task {task_id}: TDD iteration completed (no reflection)")
                 self.log("info", f"✅ TASK {task_id} COMPLETED (no reflection)")
                 return True
             
+            # Only reflection reads the full diff
+            current_diff, lines_changed = await self._get_git_working_changes()
+            
             # Run reflection quality gate
             self.log("info", "")
             self.log("info", f"🤖 STARTING GPT-5 REFLECTION ANALYSIS...")
@@ -399,27 +539,37 @@ class TDDAgent(Agent):
                 bdd_scenarios = current_task.get('acceptance_criteria', '') or current_task.get('description', '')
                 iteration_context = f"TDD iteration {attempt_num}/{self.max_reflection_retries}"
                 
-                reflection_result = self.reflection_service.evaluate_tdd_implementation(
-                    git_diff=current_diff,
-                    task_details=current_task,
-                    bdd_scenarios=bdd_scenarios,
-                    iteration_context=iteration_context
+                # Start reflection in the background and use its round trip to
+                # get everything a retry needs ready
+                reflection_future = asyncio.get_running_loop().run_in_executor(
+                    self._reflection_executor,
+                    functools.partial(
+                        self.reflection_service.evaluate_tdd_implementation,
+                        git_diff=current_diff,
+                        task_details=current_task,
+                        bdd_scenarios=bdd_scenarios,
+                        iteration_context=iteration_context
+                    )
                 )
+                self.log("info", f"📏 Working changes detected: {lines_changed} diff lines")
+                feedback_task = self._prepare_feedback_task(current_task)
+                
+                reflection_result = await reflection_future
                 
                 self.log("info", f"📊 REFLECTION COMPLETE")
                 self.log("info", f"🎯 Status: {reflection_result.status.upper()}")
                 
                 # Show full feedback without truncation
-                self.log("info", f"📝 Feedback (Full):")
-                feedback_lines = reflection_result.feedback.split('\n')
-                for line in feedback_lines:
-                    if line.strip():
-                        self.log("info", f"   {line.strip()}")
+                if self.is_log_enabled("info"):
+                    self.log("info", "\n".join([
+                        "📝 Feedback (Full):",
+                        *(f"   {line.strip()}" for line in reflection_result.feedback.split('\n') if line.strip())
+                    ]))
                 
                 if reflection_result.status == "continue":
                     self.log("info", "")
                     self.log("info", f"✅ REFLECTION APPROVED - COMMITTING CHANGES")
-                    success = self._commit_changes(f"Task {task_id}: TDD iteration approved by reflection")
+                    success = await self._commit_changes(f"Task {task_id}: TDD iteration approved by reflection")
                     if success:
                         self.log("info", f"🎉 TASK {task_id} SUCCESSFULLY COMPLETED!")
                         self.log("info", "=" * 80)
@@ -435,25 +585,25 @@ class TDDAgent(Agent):
                         self.log("info", f"🔄 REFLECTION REQUESTS RETRY ({retry_count}/{self.max_reflection_retries})")
                         self.log("info", f"🎯 Providing feedback to Claude for improvement...")
                         # Run another TDD iteration with the feedback (keep working changes uncommitted)
-                        self._run_feedback_iteration(current_task, reflection_result.feedback)
+                        await self._run_feedback_iteration(feedback_task, reflection_result.feedback)
                         continue  # Go to next iteration
                     else:
                         self.log("info", "")
                         self.log("warning", f"⚠️  MAXIMUM RETRIES REACHED ({self.max_reflection_retries}) - COMMITTING ANYWAY")
-                        self._commit_changes(f"Task {task_id}: TDD iteration (max retries reached)")
+                        await self._commit_changes(f"Task {task_id}: TDD iteration (max retries reached)")
                         self.log("info", f"⚠️  TASK {task_id} COMPLETED (with warnings)")
                         self.log("info", "=" * 80)
                         return False
                 else:
                     self.log("warning", f"⚠️  Unknown reflection status: {reflection_result.status}")
-                    self._commit_changes(f"Task {task_id}: TDD iteration completed")
+                    await self._commit_changes(f"Task {task_id}: TDD iteration completed")
                     self.log("info", f"✅ TASK {task_id} COMPLETED (unknown status)")
                     return True
                     
             except Exception as e:
                 self.log("error", f"❌ REFLECTION ANALYSIS FAILED: {e}")
                 self.log("info", f"🔄 Accepting iteration due to reflection failure")
-                self._commit_changes(f"Task {task_id}: TDD iteration (reflection failed)")
+                await self._commit_changes(f"Task {task_id}: TDD iteration (reflection failed)")
                 self.log("info", f"⚠️  TASK {task_id} COMPLETED (reflection failed)")
                 self.log("info", "=" * 80)
                 return True
@@ -462,113 +612,169 @@ class TDDAgent(Agent):
         self.log("error", f"❌ Unexpected end of retry loop")
         return False
     
-    def _get_git_working_changes(self) -> str:
-        """Get current git working tree changes (staged + unstaged)."""
-        import subprocess
+    async def _wait_for_usage_reset(self, usage_limit_epoch: int) -> None:
+        """Wait until the Claude usage limit resets, plus ``post_rate_limit_delay``."""
+        await asyncio.to_thread(self.usage_parser.sleep_until_reset, usage_limit_epoch, self.logger)
+        if self.post_rate_limit_delay:
+            await asyncio.sleep(self.post_rate_limit_delay)
+    
+    async def _has_git_working_changes(self) -> bool:
+        """Check for working tree changes (staged + unstaged) via git's exit code alone."""
+        try:
+            # --quiet stops at the first difference and prints nothing
+            returncode, _, stderr = await self._run_git('diff', '--quiet', 'HEAD')
+            if returncode in (0, 1):
+                return returncode == 1
+            self.log("warning", f"Git diff failed: {stderr}")
+            return False
+        except Exception as e:
+            self.log("error", f"Error checking git working changes: {e}")
+            return False
+    
+    async def _get_git_working_changes(self) -> Tuple[str, int]:
+        """
+        Get current git working tree changes (staged + unstaged) for reflection.
+        
+        The diff is streamed and only its first ``reflection_diff_max_lines``
+        lines are kept; a longer diff ends with the diffstat of the whole
+        change instead, so it neither sits in memory whole nor is sent to the
+        reflection model whole.
+        
+        Returns:
+            Diff text and the total number of diff lines
+        """
+        process = None
         try:
             # Get all working tree changes (staged + unstaged)
-            result = subprocess.run(
-                ['git', 'diff', 'HEAD'], 
-                capture_output=True, 
-                text=True, 
+            process = await asyncio.create_subprocess_exec(
+                'git', 'diff', 'HEAD',
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
                 cwd=self.project_path
             )
-            if result.returncode == 0:
-                return result.stdout
-            else:
-                self.log("warning", f"Git diff failed: {result.stderr}")
-                return ""
+            kept = bytearray()
+            total_lines = 0
+            ends_mid_line = False
+            while True:
+                chunk = await process.stdout.read(DIFF_READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if total_lines < self.reflection_diff_max_lines:
+                    # Keep the chunk up to the end of the last line still wanted
+                    cut = -1
+                    for _ in range(self.reflection_diff_max_lines - total_lines):
+                        cut = chunk.find(b'\n', cut + 1)
+                        if cut == -1:
+                            break
+                    kept += chunk if cut == -1 else chunk[:cut + 1]
+                # Count the lines past the limit without holding on to them
+                total_lines += chunk.count(b'\n')
+                ends_mid_line = not chunk.endswith(b'\n')
+            if ends_mid_line:
+                total_lines += 1
+            stderr = await process.stderr.read()
+            
+            if await process.wait() != 0:
+                self.log("warning", f"Git diff failed: {stderr.decode('utf-8', errors='replace')}")
+                return "", 0
+            
+            diff = kept.decode('utf-8', errors='replace')
+            kept_lines = min(total_lines, self.reflection_diff_max_lines)
+            if total_lines > kept_lines:
+                self.log("info", f"✂️  Diff truncated to {kept_lines} of {total_lines} lines for reflection")
+                _, stat, _ = await self._run_git('diff', '--stat', 'HEAD')
+                diff += (
+                    f"\n... diff truncated after {kept_lines} of {total_lines} lines; "
+                    f"summary of all changes:\n{stat}"
+                )
+            return diff, total_lines
         except Exception as e:
             self.log("error", f"Error getting git working changes: {e}")
-            return ""
+            return "", 0
+        finally:
+            # Never leave the git child running or unreaped
+            if process is not None and process.returncode is None:
+                process.kill()
+                await process.wait()
+    
+    async def _run_git(self, *args: str) -> Tuple[int, str, str]:
+        """Run a git command in the project directory; returns (return code, stdout, stderr)."""
+        return await run_process(['git', '-C', self.project_path, *args])
     
-    def _commit_changes(self, commit_message: str) -> bool:
+    async def _commit_changes(self, commit_message: str) -> bool:
         """Commit current working changes."""
-        import subprocess
         try:
             self.log("info", f"💾 COMMITTING CHANGES...")
             self.log("info", f"📝 Message: {commit_message}")
             
-            # Add all changes
-            add_result = subprocess.run(
-                ['git', 'add', '.'],
-                capture_output=True,
-                text=True,
-                cwd=self.project_path
-            )
+            # Add all changes; --verbose lists each staged path, replacing a
+            # separate `git status` call
+            add_code, add_stdout, add_stderr = await self._run_git('add', '--verbose', '.')
             
-            if add_result.returncode != 0:
-                self.log("error", f"❌ Git add failed: {add_result.stderr}")
+            if add_code != 0:
+                self.log("error", f"❌ Git add failed: {add_stderr}")
                 return False
             
             # Show what's being committed
-            status_result = subprocess.run(
-                ['git', 'status', '--short'],
-                capture_output=True,
-                text=True,
-                cwd=self.project_path
-            )
-            
-            if status_result.returncode == 0 and status_result.stdout.strip():
+            if add_stdout.strip():
                 self.log("info", f"📋 Files to commit:")
-                for line in status_result.stdout.strip().split('\n'):
+                for line in add_stdout.strip().split('\n'):
                     if line.strip():
                         self.log("info", f"   {line}")
             
             # Commit changes
-            commit_result = subprocess.run(
-                ['git', 'commit', '-m', commit_message],
-                capture_output=True,
-                text=True,
-                cwd=self.project_path
-            )
+            commit_code, commit_stdout, commit_stderr = await self._run_git('commit', '-m', commit_message)
             
-            if commit_result.returncode == 0:
-                # Get commit hash
-                hash_result = subprocess.run(
-                    ['git', 'rev-parse', '--short', 'HEAD'],
-                    capture_output=True,
-                    text=True,
-                    cwd=self.project_path
-                )
-                commit_hash = hash_result.stdout.strip() if hash_result.returncode == 0 else "unknown"
+            if commit_code == 0:
+                # The hash is in commit's "[branch abc1234] message" summary line,
+                # so no `git rev-parse` is needed
+                match = COMMIT_SUMMARY_PATTERN.match(commit_stdout)
+                commit_hash = match.group(1) if match else "unknown"
                 
                 self.log("info", f"✅ COMMIT SUCCESSFUL!")
                 self.log("info", f"🔗 Hash: {commit_hash}")
                 return True
             else:
-                self.log("warning", f"❌ Git commit failed: {commit_result.stderr}")
+                self.log("warning", f"❌ Git commit failed: {commit_stderr}")
                 return False
                 
         except Exception as e:
             self.log("error", f"❌ Error committing changes: {e}")
             return False
     
-    def _run_feedback_iteration(self, current_task: Dict[str, Any], feedback: str) -> None:
-        """Run an additional TDD iteration with reflection feedback."""
-        self.log("info", f"🔄 Running feedback iteration for task {current_task['id']}")
-        
-        # Create a modified task with feedback included
-        feedback_task = current_task.copy()
-        original_description = feedback_task.get('description', '')
-        original_criteria = feedback_task.get('acceptance_criteria', '')
+    def _prepare_feedback_task(self, current_task: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Task for a feedback iteration: only the fields the TDD prompt reads, so
+        the raw work item payload (``full_details``) is not copied per retry.
+        """
+        return {
+            key: current_task.get(key, '')
+            for key in ('id', 'title', 'description', 'acceptance_criteria')
+        }
+    
+    async def _run_feedback_iteration(self, feedback_task: Dict[str, Any], feedback: str) -> None:
+        """
+        Run an additional TDD iteration with reflection feedback.
         
-        # Add feedback to the task context
-        feedback_context = f"\n\n**REFLECTION FEEDBACK FROM PREVIOUS ITERATION:**\n{feedback}\n\nPlease address this feedback in your next TDD iteration."
+        Args:
+            feedback_task: Task from _prepare_feedback_task
+            feedback: Reflection feedback from the previous iteration
+        """
+        self.log("info", f"🔄 Running feedback iteration for task {feedback_task['id']}")
         
-        feedback_task['description'] = original_description + feedback_context
-        feedback_task['acceptance_criteria'] = original_criteria + feedback_context
+        # The prompt renders the feedback once, after the acceptance criteria
+        feedback_task['reflection_feedback'] = feedback
         
         # Run the feedback iteration (without reflection to avoid infinite loops)
         try:
-            usage_limit_epoch, return_code = self.session_manager.run_single_iteration(feedback_task)
+            usage_limit_epoch, return_code = await self.session_manager.run_single_iteration_async(
+                feedback_task, cwd=self.project_path
+            )
             
             # Handle usage limits
             if usage_limit_epoch:
                 self.log("warning", "Claude usage limit detected during feedback iteration")
-                self.usage_parser.sleep_until_reset(usage_limit_epoch, self.logger)
-                import time
-                time.sleep(2)
+                await self._wait_for_usage_reset(usage_limit_epoch)
             
             if return_code != 0:
                 self.log("warning", f"Feedback iteration exited with code {return_code}")
@@ -576,104 +782,169 @@ class TDDAgent(Agent):
         except Exception as e:
             self.log("error", f"Error during feedback iteration: {e}")
 
-    def _get_work_item_details(self, work_item_id: str) -> Dict[str, Any]:
-        """Fetch work item details from Azure DevOps."""
-        import subprocess
-        import json
+    async def _iter_child_tasks(self, parent_id: str) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Get all child task work items for a parent PBI, one page at a time.
         
+        The query orders tasks by ID and each page holds up to 200 of them
+        (one workitemsbatch request), so pages arrive in processing order.
+        """
         try:
-            cmd = ["az", "boards", "work-item", "show", "--id", work_item_id]
-            if self.organization:
-                cmd.extend(["--organization", self.organization])
+            # Query for child work items; the ID is cast so only a number
+            # ever reaches the query text
+            query = CHILD_TASKS_WIQL.format(parent_id=int(parent_id))
             
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            work_item = json.loads(result.stdout)
+            query_result = await self.azure_client.query_work_items(query)
+            work_items = query_result.get("workItems", [])
             
-            self.log("debug", f"Fetched work item {work_item_id}: {work_item.get('fields', {}).get('System.Title', 'Unknown')}")
-            return work_item
+            self.log_lazy("debug", "Query returned %d work items: %s", len(work_items), work_items)
             
-        except subprocess.CalledProcessError as e:
-            self.log("error", f"Failed to fetch work item {work_item_id}: {e}")
-            raise
-        except json.JSONDecodeError as e:
-            self.log("error", f"Failed to parse work item JSON: {e}")
+            task_ids = [item["id"] for item in work_items]
+            async for page in self.azure_client.iter_work_items_batches(task_ids, TASK_FIELDS):
+                yield self._build_task_page(page)
+            
+        except httpx.HTTPError as e:
+            self.log("error", f"Failed to query child tasks for {parent_id}: {e}")
             raise
     
-    def _get_child_tasks(self, parent_id: str) -> List[Dict[str, Any]]:
-        """Get all child task work items for a parent PBI."""
-        import subprocess
-        import json
+    def _build_task_page(self, page: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Turn a page of task work items into task dicts, sorted by ID.
+        
+        Tasks that are already Done are only counted (``tasks_done_at_start``),
+        so they are never refreshed or skipped over later.
+        """
+        tasks = []
+        for task_details in page:
+            fields = task_details.get("fields", {})
+            if fields.get("System.State") == "Done":
+                self.tasks_done_at_start += 1
+                continue
+            tasks.append({
+                # Kept as an int; it is only formatted into messages and URLs
+                "id": task_details["id"],
+                "title": fields.get("System.Title", ""),
+                "description": fields.get("System.Description", ""),
+                "state": fields.get("System.State", ""),
+                "acceptance_criteria": fields.get("Microsoft.VSTS.Common.AcceptanceCriteria", ""),
+                "full_details": task_details
+            })
+        
+        # Sort tasks by ID for consistent processing order
+        tasks.sort(key=operator.itemgetter("id"))
+        
+        observed_at = time.monotonic()
+        for task in tasks:
+            self._state_cache[task["id"]] = (observed_at, task["state"])
+        return tasks
+    
+    async def _load_remaining_tasks(self, task_pages: AsyncIterator[List[Dict[str, Any]]]) -> None:
+        """Append the pages of tasks after the first to the task list as they arrive."""
+        async for page in task_pages:
+            self.current_tasks.extend(page)
+            self.log_lazy("debug", "Loaded %d more tasks (%d total)", len(page), len(self.current_tasks))
+    
+    async def _finish_loading_tasks(self) -> bool:
+        """
+        Wait for the background task load, if one is still outstanding.
+        
+        Returns:
+            True if it was outstanding (so more tasks may now be listed)
+        """
+        if self._task_loader is None:
+            return False
+        task_loader, self._task_loader = self._task_loader, None
+        await task_loader
+        return True
+    
+    async def _get_task_states(self, tasks: List[Dict[str, Any]]) -> Dict[int, str]:
+        """
+        Get the current state of several tasks, keyed by task ID.
+        
+        States observed less than ``state_cache_ttl`` seconds ago are reused;
+        the rest are fetched in one request.
+        """
+        now = time.monotonic()
+        states = {}
+        stale_ids = []
+        for task in tasks:
+            cached = self._state_cache.get(task['id'])
+            if cached and now - cached[0] < self.state_cache_ttl:
+                states[task['id']] = cached[1]
+            else:
+                stale_ids.append(task['id'])
+        
+        if not stale_ids:
+            return states
         
         try:
-            # Query for child work items
-            query = f"SELECT [System.Id], [System.Title], [System.Description], [System.State] FROM WorkItems WHERE [System.Parent] = {parent_id} AND [System.WorkItemType] = 'Task'"
-            
-            cmd = ["az", "boards", "query", "--wiql", query]
-            if self.organization:
-                cmd.extend(["--organization", self.organization])
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            query_result = json.loads(result.stdout)
-            
-            self.log("debug", f"Query result type: {type(query_result)}, content: {query_result}")
-            
-            tasks = []
-            # Handle different possible response formats
-            work_items = []
-            if isinstance(query_result, list):
-                # If the result is directly a list of work items
-                work_items = query_result
-            elif isinstance(query_result, dict):
-                # If the result is wrapped in a dictionary
-                work_items = query_result.get("workItems", [])
-            
-            for item in work_items:
-                task_id = str(item["id"])
-                # Get full task details
-                task_details = self._get_work_item_details(task_id)
-                
-                fields = task_details.get("fields", {})
-                task_info = {
-                    "id": task_id,
-                    "title": fields.get("System.Title", ""),
-                    "description": fields.get("System.Description", ""),
-                    "state": fields.get("System.State", ""),
-                    "acceptance_criteria": fields.get("Microsoft.VSTS.Common.AcceptanceCriteria", ""),
-                    "full_details": task_details
-                }
-                tasks.append(task_info)
-            
-            # Sort tasks by ID for consistent processing order
-            tasks.sort(key=lambda x: int(x["id"]))
-            return tasks
-            
-        except subprocess.CalledProcessError as e:
-            self.log("error", f"Failed to query child tasks for {parent_id}: {e}")
-            raise
-        except json.JSONDecodeError as e:
-            self.log("error", f"Failed to parse query results: {e}")
-            raise
+            work_items = await self.azure_client.get_work_items_batch(stale_ids, ["System.State"])
+        except httpx.HTTPError as e:
+            self.log("warning", f"Could not check current state of remaining tasks: {e}")
+            # Continue with cached states if the API call fails
+            return states
+        
+        observed_at = time.monotonic()
+        for work_item in work_items:
+            task_id = work_item["id"]
+            states[task_id] = work_item.get("fields", {}).get("System.State", "")
+            self._state_cache[task_id] = (observed_at, states[task_id])
+        return states
+    
+    def _close_sessions(self) -> None:
+        """Close the Claude and Azure DevOps sessions and their event loop."""
+        if self._loop is None:
+            return
+        if self._task_loader is not None:
+            self._task_loader.cancel()
+            self._loop.run_until_complete(asyncio.gather(self._task_loader, return_exceptions=True))
+            self._task_loader = None
+        if self._state_prefetch is not None:
+            self._state_prefetch.cancel()
+            self._loop.run_until_complete(asyncio.gather(self._state_prefetch, return_exceptions=True))
+            self._state_prefetch = None
+        if self.session_manager is not None:
+            self._loop.run_until_complete(self.session_manager.close())
+        self._loop.run_until_complete(self.azure_client.aclose())
+        self._loop.close()
+        self._loop = None
     
-    def _update_task_status(self, task_id: str, state: str) -> bool:
-        """Update task status in Azure DevOps."""
-        import subprocess
+    async def _flush_state_updates(self) -> bool:
+        """
+        Send the queued task state transitions to Azure DevOps in one request.
+        
+        Returns:
+            True if every queued transition was applied
+        """
+        if not self._pending_state_updates:
+            return True
         
+        updates, self._pending_state_updates = self._pending_state_updates, []
         try:
-            cmd = [
-                "az", "boards", "work-item", "update", 
-                "--id", task_id, 
-                "--state", state
-            ]
-            if self.organization:
-                cmd.extend(["--organization", self.organization])
-            
-            subprocess.run(cmd, capture_output=True, text=True, check=True)
-            self.log("info", f"✅ Updated task {task_id} to '{state}' status")
-            return True
-            
-        except subprocess.CalledProcessError as e:
-            self.log("error", f"Failed to update task {task_id} status: {e}")
+            # The client retries throttled and failed requests with backoff
+            work_items = await self.azure_client.update_work_items_batch(
+                [(task_id, {"System.State": state}) for task_id, state in updates]
+            )
+        except httpx.HTTPError as e:
+            self.log("error", f"Failed to update status of tasks {[task_id for task_id, _ in updates]}: {e}")
+            # The server states are unknown now; make the next refresh fetch them
+            for task_id, _ in updates:
+                self._state_cache.pop(task_id, None)
             return False
+        
+        observed_at = time.monotonic()
+        for (task_id, state), work_item in zip(updates, work_items):
+            if work_item is None:
+                self.log("error", f"Failed to update task {task_id} status to {state}")
+                self._state_cache.pop(task_id, None)
+                continue
+            # Cache the state the server reports back, in place of the old one
+            self._state_cache[task_id] = (
+                observed_at,
+                work_item.get("fields", {}).get("System.State", state)
+            )
+            self.log("info", f"✅ Updated task {task_id} to '{state}' status")
+        return all(work_item is not None for work_item in work_items)
 
 
 def create_tdd_agent(project_path: str, work_item_id: str, organization: str = None) -> TDDAgent:
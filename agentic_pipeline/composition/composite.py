@@ -1,18 +1,36 @@
 """Composite agent for orchestrating multiple agents in workflows."""
 
-from typing import Any, Dict, List, Optional, Callable, Union
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Callable, Set, Tuple, Union
 from enum import Enum
 
 from ..core.agent import Agent, AgentResult, AgentStatus
 from ..core.state import AgentState
 from ..core.config import AgentConfig
 from ..core.pipeline import AgentPipeline
+from ..utils.json_codec import dumps_canonical
 
 
+# Cached step results kept per composite agent; least recently used go first
+STEP_CACHE_SIZE = 256
+
+# Workflow bookkeeping the composite's own results merge into its state; it
+# changes every iteration, so it is left out of step cache keys
+STEP_BOOKKEEPING_KEYS = frozenset({
+    "completed_steps", "failed_steps", "step_results", "step_result",
+    "current_step", "failed_step"
+})
+
 class WorkflowMode(Enum):
     """Modes for workflow execution."""
     SEQUENTIAL = "sequential"      # Execute agents one after another
-    PARALLEL = "parallel"          # Execute agents concurrently (not implemented)
+    PARALLEL = "parallel"          # Execute agents concurrently
+    DISTRIBUTED = "distributed"    # Execute agents concurrently on Celery workers
     CONDITIONAL = "conditional"    # Execute agents based on conditions
     LOOP = "loop"                 # Loop through agents until condition met
 
@@ -20,20 +38,31 @@ class WorkflowMode(Enum):
 class AgentStep:
     """Represents a single step in a workflow."""
     
+    # One per workflow step, and parallel groups multiply them; no per-instance dict
+    __slots__ = (
+        "agent", "condition", "on_success", "on_failure", "max_iterations",
+        "cacheable", "cache_ttl", "step_id", "pipeline"
+    )
+    
     def __init__(
         self,
         agent: Agent,
         condition: Optional[Callable[[AgentState], bool]] = None,
         on_success: Optional[str] = None,
         on_failure: Optional[str] = None,
-        max_iterations: Optional[int] = None
+        max_iterations: Optional[int] = None,
+        cacheable: bool = False,
+        cache_ttl: Optional[float] = None
     ):
         self.agent = agent
         self.condition = condition  # Condition to execute this step
         self.on_success = on_success  # Next step ID on success
         self.on_failure = on_failure  # Next step ID on failure
         self.max_iterations = max_iterations
+        self.cacheable = cacheable  # Reuse results for an identical step context
+        self.cache_ttl = cache_ttl  # Seconds cached results stay valid (None: forever)
         self.step_id = agent.name
+        self.pipeline: Optional[AgentPipeline] = None  # Created by CompositeAgent.initialize
 
 
 class CompositeAgent(Agent):
@@ -42,6 +71,7 @@ class CompositeAgent(Agent):
     
     Supports:
     - Sequential execution
+    - Parallel execution (in-process or on Celery workers)
     - Conditional branching
     - Loop execution
     - State passing between agents
@@ -57,6 +87,18 @@ class CompositeAgent(Agent):
         self.current_step_index = 0
         self.completed_steps: List[str] = []
         self.failed_steps: List[str] = []
+        # Same step IDs as the lists above, for constant-time membership tests
+        self._completed_set: Set[str] = set()
+        self._failed_set: Set[str] = set()
+        # Step ID -> step, for following on_success/on_failure transitions
+        self._by_id: Dict[str, AgentStep] = {}
+        # Target of the last conditional step's transition, if it had one
+        self._next_step_id: Optional[str] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # (step ID, step input digest) -> (time.monotonic() when run, pipeline results),
+        # oldest use first; parallel steps reach it from worker threads
+        self._step_cache: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._step_cache_lock = threading.Lock()
     
     def set_workflow_mode(self, mode: WorkflowMode) -> None:
         """Set the workflow execution mode."""
@@ -68,7 +110,9 @@ class CompositeAgent(Agent):
         condition: Optional[Callable[[AgentState], bool]] = None,
         on_success: Optional[str] = None,
         on_failure: Optional[str] = None,
-        max_iterations: Optional[int] = None
+        max_iterations: Optional[int] = None,
+        cacheable: bool = False,
+        cache_ttl: Optional[float] = None
     ) -> 'CompositeAgent':
         """
         Add a step to the workflow.
@@ -79,6 +123,9 @@ class CompositeAgent(Agent):
             on_success: Next step ID on success (for conditional workflows)
             on_failure: Next step ID on failure (for conditional workflows)
             max_iterations: Override max iterations for this step
+            cacheable: Reuse the step's completed results when it runs again
+                with the same inputs, instead of re-running its agent
+            cache_ttl: Seconds cached results stay valid (default: no expiry)
             
         Returns:
             Self for method chaining
@@ -88,23 +135,29 @@ class CompositeAgent(Agent):
             condition=condition,
             on_success=on_success,
             on_failure=on_failure,
-            max_iterations=max_iterations
+            max_iterations=max_iterations,
+            cacheable=cacheable,
+            cache_ttl=cache_ttl
         )
         self.steps.append(step)
         return self
     
     def initialize(self, context: Dict[str, Any]) -> None:
-        """Initialize the composite agent and all sub-agents."""
+        """Initialize the composite agent and a pipeline for each step."""
         self.log("info", f"Initializing CompositeAgent with {len(self.steps)} steps")
         
-        # Initialize all sub-agents
+        self._by_id = {step.step_id: step for step in self.steps}
+        for step in self.steps:
+            for target in (step.on_success, step.on_failure):
+                if target is not None and target not in self._by_id:
+                    raise ValueError(f"Step {step.step_id} transitions to unknown step '{target}'")
+        
+        # One pipeline per step, reused every time the step runs. The pipeline
+        # owns its agent's lifecycle: each run initializes and finalizes the
+        # agent, so sub-agents are not initialized here as well
         for i, step in enumerate(self.steps):
-            try:
-                step.agent.initialize(context)
-                self.log("info", f"Initialized step {i+1}: {step.agent.name}")
-            except Exception as e:
-                self.log("error", f"Failed to initialize step {i+1} ({step.agent.name}): {e}")
-                raise
+            step.pipeline = AgentPipeline(step.agent, logger=self._logger)
+            self.log("info", f"Prepared step {i+1}: {step.agent.name}")
         
         self.status = AgentStatus.RUNNING
         self.log("info", "CompositeAgent initialization completed")
@@ -116,6 +169,10 @@ class CompositeAgent(Agent):
         
         if self.workflow_mode == WorkflowMode.SEQUENTIAL:
             return self._execute_sequential(state)
+        elif self.workflow_mode == WorkflowMode.PARALLEL:
+            return self._execute_parallel(state)
+        elif self.workflow_mode == WorkflowMode.DISTRIBUTED:
+            return self._execute_distributed(state)
         elif self.workflow_mode == WorkflowMode.CONDITIONAL:
             return self._execute_conditional(state)
         elif self.workflow_mode == WorkflowMode.LOOP:
@@ -142,16 +199,7 @@ class CompositeAgent(Agent):
         self.log("info", f"Executing step {self.current_step_index + 1}: {agent.name}")
         
         try:
-            # Create pipeline for this agent
-            pipeline = AgentPipeline(agent, logger=self._logger)
-            
-            # Override max iterations if specified
-            if current_step.max_iterations:
-                agent.config.max_iterations = current_step.max_iterations
-            
-            # Run the agent pipeline
-            step_context = self._build_step_context(state)
-            results = pipeline.run(step_context)
+            results = self._run_step_pipeline(current_step, self._build_step_context(state))
             
             # Store step results
             self.step_results[agent.name] = results
@@ -161,7 +209,7 @@ class CompositeAgent(Agent):
             step_successful = pipeline_status.get("final_status") == "completed"
             
             if step_successful:
-                self.completed_steps.append(agent.name)
+                self._mark_completed(agent.name)
                 self.current_step_index += 1
                 
                 # Merge agent's final state into composite state
@@ -189,7 +237,7 @@ class CompositeAgent(Agent):
                     )
             else:
                 # Step failed
-                self.failed_steps.append(agent.name)
+                self._mark_failed(agent.name)
                 error_msg = f"Step {agent.name} failed"
                 
                 return AgentResult(
@@ -201,7 +249,7 @@ class CompositeAgent(Agent):
                 )
         
         except Exception as e:
-            self.failed_steps.append(agent.name)
+            self._mark_failed(agent.name)
             error_msg = f"Step {agent.name} failed with exception: {e}"
             self.log("error", error_msg)
             
@@ -213,19 +261,204 @@ class CompositeAgent(Agent):
                 error=str(e)
             )
     
+    def _execute_parallel(self, state: AgentState) -> AgentResult:
+        """
+        Execute all remaining steps concurrently.
+        
+        Each step's pipeline runs on a worker thread (``parallel_workers``
+        parameter, default 8), so steps waiting on Claude or other I/O overlap.
+        Every step sees the same context, built before any of them start.
+        """
+        pending = self._pending_steps()
+        if not pending:
+            return self._parallel_completed()
+        
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.config.get_parameter("parallel_workers", 8),
+                thread_name_prefix=f"{self.name}-step"
+            )
+        
+        self.log("info", f"Executing {len(pending)} steps in parallel")
+        step_context = self._build_step_context(state)
+        futures = {
+            self._executor.submit(self._run_step_pipeline, step, step_context): step
+            for step in pending
+        }
+        
+        # Results are merged here, on the calling thread, as each step finishes
+        errors = {}
+        for future in as_completed(futures):
+            try:
+                outcome = future.result()
+            except Exception as e:
+                outcome = e
+            self._record_parallel_outcome(futures[future], outcome, state, errors)
+        
+        return self._parallel_result(errors)
+    
+    def _execute_distributed(self, state: AgentState) -> AgentResult:
+        """
+        Execute all remaining steps concurrently as Celery tasks.
+        
+        Each step's agent is rebuilt and run by a worker (see
+        ``agentic_pipeline.tasks``); this agent only dispatches the steps and
+        waits up to ``step_timeout`` seconds (parameter, default: no limit)
+        for each result.
+        
+        Raises:
+            TypeError: If a step is itself a composite agent (e.g. a parallel group)
+        """
+        # Celery is optional; only distributed workflows need it
+        from ..tasks import run_agent_step, serialize_agent
+        
+        pending = self._pending_steps()
+        if not pending:
+            return self._parallel_completed()
+        
+        serialized = {}
+        for step in pending:
+            # Override max iterations if specified
+            if step.max_iterations:
+                step.agent.config.max_iterations = step.max_iterations
+            # Every step is serialized before any is dispatched, so a step that
+            # cannot be distributed (e.g. a nested composite) fails the
+            # iteration before its siblings have started
+            serialized[step] = serialize_agent(step.agent)
+        
+        step_context = self._build_step_context(state)
+        async_results = {}
+        for step, description in serialized.items():
+            async_results[step] = run_agent_step.apply_async(args=[description, step_context])
+            self.log("info", f"Dispatched step {step.agent.name} as task {async_results[step].id}")
+        
+        timeout = self.config.get_parameter("step_timeout")
+        errors = {}
+        for step, async_result in async_results.items():
+            try:
+                outcome = async_result.get(timeout=timeout)
+            except Exception as e:
+                outcome = e
+            self._record_parallel_outcome(step, outcome, state, errors)
+        
+        return self._parallel_result(errors)
+    
+    async def aexecute_iteration(self, state: AgentState) -> AgentResult:
+        """
+        Execute one iteration of the composite workflow without blocking the event loop.
+        
+        Parallel steps are awaited together with ``asyncio.gather``; the other
+        modes run one step per iteration, which is awaited on a worker thread.
+        """
+        if self.workflow_mode == WorkflowMode.PARALLEL:
+            iteration_num = state.iteration + 1
+            self.log("info", f"Executing composite workflow iteration {iteration_num}")
+            return await self._aexecute_parallel(state)
+        return await asyncio.to_thread(self.execute_iteration, state)
+    
+    async def _aexecute_parallel(self, state: AgentState) -> AgentResult:
+        """Execute all remaining steps concurrently on the running event loop."""
+        pending = self._pending_steps()
+        if not pending:
+            return self._parallel_completed()
+        
+        self.log("info", f"Executing {len(pending)} steps in parallel")
+        step_context = self._build_step_context(state)
+        outcomes = await asyncio.gather(
+            *(self._arun_step_pipeline(step, step_context) for step in pending),
+            return_exceptions=True
+        )
+        
+        # gather returns once every step is done, so merging needs no lock
+        errors = {}
+        for step, outcome in zip(pending, outcomes):
+            self._record_parallel_outcome(step, outcome, state, errors)
+        
+        return self._parallel_result(errors)
+    
+    def _pending_steps(self) -> List[AgentStep]:
+        """Steps that have neither completed nor failed."""
+        return [
+            step for step in self.steps
+            if step.step_id not in self._completed_set and step.step_id not in self._failed_set
+        ]
+    
+    def _parallel_completed(self) -> AgentResult:
+        """Result for a parallel workflow with no steps left to run."""
+        self.status = AgentStatus.COMPLETED
+        return AgentResult(
+            status=AgentStatus.COMPLETED,
+            message=f"{self.workflow_mode.value.capitalize()} workflow completed",
+            data={"completed_steps": self.completed_steps},
+            terminal=True
+        )
+    
+    def _record_parallel_outcome(
+        self,
+        step: AgentStep,
+        outcome: Union[Dict[str, Any], Exception],
+        state: AgentState,
+        errors: Dict[str, str]
+    ) -> None:
+        """Merge one parallel step's pipeline results (or exception) into the workflow."""
+        agent = step.agent
+        if isinstance(outcome, Exception):
+            self._mark_failed(agent.name)
+            errors[agent.name] = str(outcome)
+            self.log("error", f"Step {agent.name} failed with exception: {outcome}")
+            return
+        
+        self.step_results[agent.name] = outcome
+        pipeline_status = outcome.get("pipeline_status", {})
+        if pipeline_status.get("final_status") == "completed":
+            self._mark_completed(agent.name)
+            agent_state = outcome.get("final_state", {})
+            if agent_state and "data" in agent_state:
+                state.update({f"{agent.name}_result": agent_state["data"]})
+            self.log("info", f"Step {agent.name} completed successfully")
+        else:
+            self._mark_failed(agent.name)
+            errors[agent.name] = f"Step {agent.name} failed"
+    
+    def _parallel_result(self, errors: Dict[str, str]) -> AgentResult:
+        """Result of a parallel iteration, failed if any of its steps failed."""
+        if errors:
+            error_msg = f"Parallel steps failed: {', '.join(errors)}"
+            return AgentResult(
+                status=AgentStatus.FAILED,
+                message=error_msg,
+                data={"failed_steps": list(errors), "step_results": self.step_results},
+                terminal=True,
+                error="; ".join(errors.values())
+            )
+        
+        self.status = AgentStatus.COMPLETED
+        return AgentResult(
+            status=AgentStatus.COMPLETED,
+            message="All parallel steps completed",
+            data={"step_results": self.step_results},
+            terminal=True
+        )
+    
     def _execute_conditional(self, state: AgentState) -> AgentResult:
-        """Execute workflow with conditional branching."""
-        # Find next step to execute based on conditions
+        """
+        Execute workflow with conditional branching.
+        
+        A step's ``on_success``/``on_failure`` names the step to run after it;
+        without one, the first remaining step whose condition holds runs next.
+        """
         next_step = None
         
-        for step in self.steps:
-            if step.step_id in self.completed_steps:
-                continue
-            
-            # Check if condition is met (or no condition)
-            if step.condition is None or step.condition(state):
-                next_step = step
-                break
+        if self._next_step_id is not None:
+            next_step = self._by_id[self._next_step_id]
+            self._next_step_id = None
+        else:
+            # Find next step to execute based on conditions
+            for step in self._pending_steps():
+                # Check if condition is met (or no condition)
+                if step.condition is None or step.condition(state):
+                    next_step = step
+                    break
         
         if next_step is None:
             # No more steps to execute
@@ -239,7 +472,22 @@ class CompositeAgent(Agent):
         
         # Execute the step
         self.log("info", f"Executing conditional step: {next_step.agent.name}")
-        return self._execute_single_step(next_step, state)
+        result = self._execute_single_step(next_step, state)
+        
+        if result.status == AgentStatus.FAILED:
+            self._next_step_id = next_step.on_failure
+            if self._next_step_id is not None:
+                # The failure is handled by the step it transitions to
+                return AgentResult(
+                    status=AgentStatus.RUNNING,
+                    message=f"{result.message}; continuing with {self._next_step_id}",
+                    data=result.data,
+                    terminal=False,
+                    error=result.error
+                )
+        else:
+            self._next_step_id = next_step.on_success
+        return result
     
     def _execute_loop(self, state: AgentState) -> AgentResult:
         """Execute workflow in a loop until condition is met."""
@@ -270,16 +518,7 @@ class CompositeAgent(Agent):
         agent = step.agent
         
         try:
-            # Create pipeline for this agent
-            pipeline = AgentPipeline(agent, logger=self._logger)
-            
-            # Override max iterations if specified
-            if step.max_iterations:
-                agent.config.max_iterations = step.max_iterations
-            
-            # Run the agent pipeline
-            step_context = self._build_step_context(state)
-            results = pipeline.run(step_context)
+            results = self._run_step_pipeline(step, self._build_step_context(state))
             
             # Store step results
             self.step_results[agent.name] = results
@@ -289,7 +528,7 @@ class CompositeAgent(Agent):
             step_successful = pipeline_status.get("final_status") == "completed"
             
             if step_successful:
-                self.completed_steps.append(agent.name)
+                self._mark_completed(agent.name)
                 
                 # Merge results into state
                 agent_state = results.get("final_state", {})
@@ -303,7 +542,7 @@ class CompositeAgent(Agent):
                     terminal=False
                 )
             else:
-                self.failed_steps.append(agent.name)
+                self._mark_failed(agent.name)
                 return AgentResult(
                     status=AgentStatus.FAILED,
                     message=f"Step {agent.name} failed",
@@ -312,7 +551,7 @@ class CompositeAgent(Agent):
                 )
         
         except Exception as e:
-            self.failed_steps.append(agent.name)
+            self._mark_failed(agent.name)
             return AgentResult(
                 status=AgentStatus.FAILED,
                 message=f"Step {agent.name} failed: {e}",
@@ -321,6 +560,102 @@ class CompositeAgent(Agent):
                 error=str(e)
             )
     
+    def _mark_completed(self, step_id: str) -> None:
+        """Record a step as completed."""
+        self.completed_steps.append(step_id)
+        self._completed_set.add(step_id)
+    
+    def _mark_failed(self, step_id: str) -> None:
+        """Record a step as failed."""
+        self.failed_steps.append(step_id)
+        self._failed_set.add(step_id)
+    
+    def _step_pipeline(self, step: AgentStep) -> AgentPipeline:
+        """Get the pipeline that runs a step's agent."""
+        # Override max iterations if specified
+        if step.max_iterations:
+            step.agent.config.max_iterations = step.max_iterations
+        
+        return step.pipeline
+    
+    def _run_step_pipeline(self, step: AgentStep, step_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a step's agent to completion in its own pipeline (or reuse cached results)."""
+        cache_key = self._step_cache_key(step, step_context)
+        cached = self._cached_step_results(step, cache_key)
+        if cached is not None:
+            return cached
+        
+        results = self._step_pipeline(step).run(step_context)
+        self._cache_step_results(cache_key, results)
+        return results
+    
+    async def _arun_step_pipeline(self, step: AgentStep, step_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Async counterpart of ``_run_step_pipeline``."""
+        cache_key = self._step_cache_key(step, step_context)
+        cached = self._cached_step_results(step, cache_key)
+        if cached is not None:
+            return cached
+        
+        results = await self._step_pipeline(step).arun(step_context)
+        self._cache_step_results(cache_key, results)
+        return results
+    
+    @staticmethod
+    def _step_cache_key(step: AgentStep, step_context: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        """
+        Key a cacheable step's results by its ID and a digest of its inputs.
+        
+        The inputs are the workflow state less the composite's bookkeeping
+        and the step's own previous result, which would otherwise make every
+        run's key unique.
+        """
+        if not step.cacheable:
+            return None
+        own_result = f"{step.step_id}_result"
+        inputs = {
+            "composite_state": {
+                key: value for key, value in step_context["composite_state"].items()
+                if key not in STEP_BOOKKEEPING_KEYS and key != own_result
+            },
+            "workflow_mode": step_context["workflow_mode"]
+        }
+        digest = hashlib.blake2b(dumps_canonical(inputs), digest_size=16).hexdigest()
+        return step.step_id, digest
+    
+    def _cached_step_results(
+        self,
+        step: AgentStep,
+        cache_key: Optional[Tuple[str, str]]
+    ) -> Optional[Dict[str, Any]]:
+        """Results of an earlier run with the same key, if still valid."""
+        if cache_key is None:
+            return None
+        
+        with self._step_cache_lock:
+            entry = self._step_cache.get(cache_key)
+            if entry is None:
+                return None
+            cached_at, results = entry
+            if step.cache_ttl is not None and time.monotonic() - cached_at >= step.cache_ttl:
+                del self._step_cache[cache_key]
+                return None
+            self._step_cache.move_to_end(cache_key)
+        
+        self.log("info", f"Reusing cached results for step {step.step_id}")
+        return results
+    
+    def _cache_step_results(self, cache_key: Optional[Tuple[str, str]], results: Dict[str, Any]) -> None:
+        """Remember a completed run's results under its key."""
+        if cache_key is None:
+            return
+        if results.get("pipeline_status", {}).get("final_status") != "completed":
+            return
+        with self._step_cache_lock:
+            self._step_cache[cache_key] = (time.monotonic(), results)
+            self._step_cache.move_to_end(cache_key)
+            while len(self._step_cache) > STEP_CACHE_SIZE:
+                self._step_cache.popitem(last=False)
+    
     def _build_step_context(self, state: AgentState) -> Dict[str, Any]:
         """Build context for a step execution."""
         context = {
@@ -335,13 +670,9 @@ class CompositeAgent(Agent):
         """Check if the composite workflow should terminate."""
         if self.workflow_mode == WorkflowMode.SEQUENTIAL:
             return self.current_step_index >= len(self.steps)
-        elif self.workflow_mode == WorkflowMode.CONDITIONAL:
+        elif self.workflow_mode in (WorkflowMode.CONDITIONAL, WorkflowMode.PARALLEL, WorkflowMode.DISTRIBUTED):
             # Check if any steps are left to execute
-            remaining_steps = [
-                step for step in self.steps 
-                if step.step_id not in self.completed_steps and step.step_id not in self.failed_steps
-            ]
-            return len(remaining_steps) == 0
+            return self._next_step_id is None and not self._pending_steps()
         else:
             # For loop mode, rely on iteration count or custom conditions
             return False
@@ -349,6 +680,9 @@ class CompositeAgent(Agent):
     def finalize(self, state: AgentState) -> Dict[str, Any]:
         """Finalize the composite workflow."""
         final_results = super().finalize(state)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
         
         final_results.update({
             "workflow_mode": self.workflow_mode.value,
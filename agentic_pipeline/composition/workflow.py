@@ -1,16 +1,65 @@
 """Workflow builder with DSL support for creating complex agent workflows."""
 
+import ast
+import functools
 import yaml
 import json
+from types import CodeType
 from typing import Any, Dict, List, Optional, Callable, Union
 from pathlib import Path
 
+# libyaml's C parser and emitter, when PyYAML was built with them
+try:
+    from yaml import CSafeLoader as YamlLoader, CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeLoader as YamlLoader, SafeDumper as YamlDumper
+
 from ..core.agent import Agent
 from ..core.config import AgentConfig
 from ..core.registry import get_registry
+from ..utils.json_codec import loads
 from .composite import CompositeAgent, WorkflowMode, AgentStep
 
 
+# Expression syntax a step condition may use: comparisons, boolean logic,
+# arithmetic, literals and subscripts over the names bound in condition_func
+CONDITION_NODES = (
+    ast.Expression, ast.BoolOp, ast.BinOp, ast.UnaryOp, ast.Compare, ast.IfExp,
+    ast.Constant, ast.Name, ast.Load, ast.Subscript, ast.Slice,
+    ast.Tuple, ast.List, ast.Set, ast.Dict, ast.Call, ast.keyword, ast.Attribute,
+    ast.boolop, ast.operator, ast.unaryop, ast.cmpop
+)
+# Attributes a condition may read, e.g. state.get(...) or state.data
+CONDITION_ATTRIBUTES = frozenset({"get", "data", "iteration"})
+
+
+@functools.lru_cache(maxsize=256)
+def compile_condition_code(condition_str: str) -> CodeType:
+    """
+    Parse, validate and compile a step condition expression.
+    
+    Identical conditions share one code object.
+    
+    Raises:
+        SyntaxError: If the condition is not a Python expression
+        ValueError: If the condition uses syntax outside ``CONDITION_NODES``,
+            reads an attribute outside ``CONDITION_ATTRIBUTES``, or calls
+            anything but such an attribute or ``get``
+    """
+    tree = ast.parse(condition_str, mode="eval")
+    for node in ast.walk(tree):
+        if not isinstance(node, CONDITION_NODES):
+            raise ValueError(f"Condition {condition_str!r} uses unsupported syntax: {type(node).__name__}")
+        if isinstance(node, ast.Attribute) and node.attr not in CONDITION_ATTRIBUTES:
+            raise ValueError(f"Condition {condition_str!r} reads unsupported attribute: {node.attr}")
+        if isinstance(node, ast.Call) and not (
+            isinstance(node.func, ast.Attribute)
+            or (isinstance(node.func, ast.Name) and node.func.id == "get")
+        ):
+            raise ValueError(f"Condition {condition_str!r} calls something other than get()")
+    return compile(tree, "<condition>", "eval")
+
+
 class WorkflowBuilder:
     """
     Builder for creating complex agent workflows with fluent API and YAML/JSON support.
@@ -19,6 +68,7 @@ class WorkflowBuilder:
     - Fluent API for programmatic workflow construction
     - YAML/JSON configuration files
     - Conditional execution
+    - Parallel groups
     - Loop workflows
     - Error handling strategies
     """
@@ -51,7 +101,9 @@ class WorkflowBuilder:
         condition: Optional[str] = None,
         on_success: Optional[str] = None,
         on_failure: Optional[str] = None,
-        max_iterations: Optional[int] = None
+        max_iterations: Optional[int] = None,
+        cacheable: bool = False,
+        cache_ttl: Optional[float] = None
     ) -> 'WorkflowBuilder':
         """
         Add an agent to the workflow.
@@ -64,6 +116,9 @@ class WorkflowBuilder:
             on_success: Next step on success (for conditional workflows)
             on_failure: Next step on failure (for conditional workflows)
             max_iterations: Override max iterations for this agent
+            cacheable: Reuse the agent's completed results when it runs again
+                with an identical step context
+            cache_ttl: Seconds cached results stay valid (default: no expiry)
             
         Returns:
             Self for method chaining
@@ -75,7 +130,9 @@ class WorkflowBuilder:
             "condition": condition,
             "on_success": on_success,
             "on_failure": on_failure,
-            "max_iterations": max_iterations
+            "max_iterations": max_iterations,
+            "cacheable": cacheable,
+            "cache_ttl": cache_ttl
         }
         
         self.steps.append(step_config)
@@ -115,30 +172,64 @@ class WorkflowBuilder:
             on_failure=on_failure
         )
     
-    def parallel_group(self, agent_configs: List[Dict[str, Any]]) -> 'WorkflowBuilder':
-        """Add a group of agents to execute in parallel (future feature)."""
-        # For now, just add them sequentially
-        # In the future, this could create a special parallel composite agent
+    def parallel_group(
+        self,
+        agent_configs: List[Dict[str, Any]],
+        name: Optional[str] = None
+    ) -> 'WorkflowBuilder':
+        """
+        Add a group of agents that execute in parallel as one step.
+        
+        The group is built as a nested CompositeAgent in parallel mode.
+        
+        Args:
+            agent_configs: Keyword arguments for ``add_agent``, one dict per agent
+            name: Optional name for the group step
+            
+        Returns:
+            Self for method chaining
+        """
+        group = WorkflowBuilder(name or f"parallel_group_{len(self.steps) + 1}")
+        group.set_global_config(self.global_config)
         for agent_config in agent_configs:
-            self.add_agent(**agent_config)
+            group.add_agent(**agent_config)
+        
+        self.steps.append({
+            "name": group.name,
+            "parallel": group.steps
+        })
         return self
     
     def build(self) -> CompositeAgent:
         """Build the composite agent from the workflow definition."""
+        return self._build_composite(self.name, self.workflow_mode, self.steps)
+    
+    def _build_composite(
+        self,
+        name: str,
+        mode: WorkflowMode,
+        steps: List[Dict[str, Any]]
+    ) -> CompositeAgent:
+        """Build a composite agent running the given step configurations."""
         # Create composite agent configuration
         composite_config = AgentConfig.create_simple(
-            name=self.name,
+            name=name,
             agent_type="composite_workflow",
-            max_iterations=self.global_config.get("max_iterations", 50)
+            max_iterations=self.global_config.get("max_iterations", 50),
+            parallel_workers=self.global_config.get("parallel_workers", 8),
+            step_timeout=self.global_config.get("step_timeout")
         )
         
         # Create composite agent
         composite = CompositeAgent(composite_config)
-        composite.set_workflow_mode(self.workflow_mode)
+        composite.set_workflow_mode(mode)
         
         # Create and add agent steps
-        for step_config in self.steps:
-            agent = self._create_agent_from_config(step_config)
+        for step_config in steps:
+            if "parallel" in step_config:
+                agent = self._build_composite(step_config["name"], WorkflowMode.PARALLEL, step_config["parallel"])
+            else:
+                agent = self._create_agent_from_config(step_config)
             condition = self._compile_condition(step_config.get("condition"))
             
             composite.add_step(
@@ -146,7 +237,9 @@ class WorkflowBuilder:
                 condition=condition,
                 on_success=step_config.get("on_success"),
                 on_failure=step_config.get("on_failure"),
-                max_iterations=step_config.get("max_iterations")
+                max_iterations=step_config.get("max_iterations"),
+                cacheable=step_config.get("cacheable", False),
+                cache_ttl=step_config.get("cache_ttl")
             )
         
         return composite
@@ -161,7 +254,7 @@ class WorkflowBuilder:
         config = AgentConfig.create_simple(
             name=agent_name,
             agent_type=agent_type,
-            max_iterations=step_config.get("max_iterations", 50),
+            max_iterations=step_config.get("max_iterations") or 50,
             **agent_params
         )
         
@@ -173,6 +266,9 @@ class WorkflowBuilder:
         if not condition_str:
             return None
         
+        # Parsed and checked once, when the workflow is built
+        code = compile_condition_code(condition_str)
+        
         # Create a safe evaluation environment
         def condition_func(state):
             # Provide access to state data
@@ -184,7 +280,7 @@ class WorkflowBuilder:
             }
             
             try:
-                return eval(condition_str, {"__builtins__": {}}, local_vars)
+                return eval(code, {"__builtins__": {}}, local_vars)
             except Exception as e:
                 print(f"Warning: Condition evaluation failed: {e}")
                 return False
@@ -195,14 +291,13 @@ class WorkflowBuilder:
     def from_yaml(cls, yaml_path: Union[str, Path]) -> 'WorkflowBuilder':
         """Create a workflow from YAML configuration file."""
         with open(yaml_path, 'r') as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=YamlLoader)
         return cls.from_dict(config)
     
     @classmethod
     def from_json(cls, json_path: Union[str, Path]) -> 'WorkflowBuilder':
         """Create a workflow from JSON configuration file."""
-        with open(json_path, 'r') as f:
-            config = json.load(f)
+        config = loads(Path(json_path).read_bytes())
         return cls.from_dict(config)
     
     @classmethod
@@ -220,7 +315,10 @@ class WorkflowBuilder:
         
         # Add steps
         for step_config in config.get("steps", []):
-            builder.add_agent(**step_config)
+            if "parallel" in step_config:
+                builder.parallel_group(step_config["parallel"], name=step_config.get("name"))
+            else:
+                builder.add_agent(**step_config)
         
         return builder
     
@@ -236,7 +334,7 @@ class WorkflowBuilder:
     def to_yaml(self, output_path: Union[str, Path]) -> None:
         """Export workflow configuration to YAML file."""
         with open(output_path, 'w') as f:
-            yaml.dump(self.to_dict(), f, default_flow_style=False, indent=2)
+            yaml.dump(self.to_dict(), f, Dumper=YamlDumper, default_flow_style=False, indent=2)
     
     def to_json(self, output_path: Union[str, Path]) -> None:
         """Export workflow configuration to JSON file."""
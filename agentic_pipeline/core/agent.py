@@ -65,6 +65,23 @@ class Agent(ABC):
         if self._logger:
             getattr(self._logger, level, self._logger.info)(f"[{self.name}] {message}")
     
+    def is_log_enabled(self, level: str) -> bool:
+        """Whether a message at this level would be printed."""
+        if not self._logger:
+            return False
+        is_enabled_for = getattr(self._logger, "is_enabled_for", None)
+        return is_enabled_for is None or is_enabled_for(level)
+    
+    def log_lazy(self, level: str, message: str, *args: Any) -> None:
+        """
+        Log a %-style message, formatting it only if the logger would print it.
+        
+        Use for messages in loops or at debug level, where building the string
+        is wasted work when the level is filtered out.
+        """
+        if self.is_log_enabled(level):
+            self.log(level, message % args if args else message)
+    
     @abstractmethod
     def initialize(self, context: Dict[str, Any]) -> None:
         """
@@ -1,5 +1,6 @@
 """Agent pipeline orchestrator for the agentic pipeline framework."""
 
+import asyncio
 import os
 import time
 from typing import Any, Dict, List, Optional, Callable
@@ -177,6 +178,22 @@ class AgentPipeline:
             os.environ[key] = value
             self._log("debug", f"Set environment variable: {key}")
     
+    async def arun(self, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Run the agent pipeline without blocking the event loop.
+        
+        The pipeline runs on a worker thread: agents drive their own event
+        loops from the synchronous ``execute_iteration``, which cannot run on
+        a loop that is already running.
+        
+        Args:
+            context: Optional initialization context for the agent
+            
+        Returns:
+            Dictionary containing final results and execution metadata
+        """
+        return await asyncio.to_thread(self.run, context)
+    
     def run(self, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Run the agent pipeline.
@@ -189,6 +206,9 @@ class AgentPipeline:
         """
         context = context or {}
         state = AgentState()
+        # A pipeline can be run again (e.g. a workflow step in a loop); each
+        # run reports only its own status
+        self.status = PipelineStatus()
         
         try:
             # Initialize pipeline
@@ -2,9 +2,88 @@
 
 import json
 import re
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 
 from ..core.interfaces import JsonParser
+from ..utils.json_codec import loads
+
+
+_DECODER = json.JSONDecoder()
+
+
+def _extract_json_object(text: str, start: int = 0) -> Optional[Tuple[int, int]]:
+    """
+    Find the first balanced top-level ``{...}`` span at or after ``start``.
+    
+    Single pass over the text; braces inside string literals (including
+    escaped quotes) are ignored. Returns (start, end) indices or None.
+    """
+    begin = text.find('{', start)
+    if begin == -1:
+        return None
+    
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(begin, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return begin, i + 1
+    
+    return None
+
+
+def decode_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Decode a JSON object from free-form model output.
+    
+    Tries a direct decode first, then a prefix decode (tolerating trailing
+    text), then falls back to the first balanced ``{...}`` span that decodes.
+    Returns None if no JSON object can be decoded.
+    """
+    text = text.strip()
+    try:
+        result = loads(text)
+    except json.JSONDecodeError:
+        try:
+            result, _ = _DECODER.raw_decode(text)
+        except json.JSONDecodeError:
+            return _scan_json_object(text)
+    
+    # A non-object prefix (e.g. "3 issues found: {...}") may still precede one
+    return result if isinstance(result, dict) else _scan_json_object(text)
+
+
+def _scan_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """Decode the first balanced ``{...}`` span in the text that is valid JSON."""
+    position = 0
+    while True:
+        span = _extract_json_object(text, position)
+        if span is None:
+            return None
+        start, end = span
+        try:
+            result = loads(text[start:end])
+        except json.JSONDecodeError:
+            # Not JSON (e.g. braces in prose); retry from the next opening brace
+            position = start + 1
+            continue
+        if isinstance(result, dict):
+            return result
+        position = end
 
 
 class DirectJsonParser(JsonParser):
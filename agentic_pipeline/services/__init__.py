@@ -1,5 +1,20 @@
 """Services package for external API integrations."""
 
-from .openai_reflection_service import OpenAIReflectionService, ReflectionResult
+import importlib
 
-__all__ = ['OpenAIReflectionService', 'ReflectionResult']
\ No newline at end of file
+__all__ = ['OpenAIReflectionService', 'ReflectionResult', 'AzureDevOpsClient']
+
+# Services are imported on first access so that importing one service does not
+# pull in the client libraries (openai, httpx, ...) of all the others
+_LAZY_EXPORTS = {
+    'OpenAIReflectionService': '.openai_reflection_service',
+    'ReflectionResult': '.openai_reflection_service',
+    'AzureDevOpsClient': '.azure_devops_client',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,398 @@
+"""Azure DevOps REST client for work item tracking."""
+
+import asyncio
+import base64
+import random
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+import httpx
+
+from ..utils.json_codec import loads
+
+import sys
+from pathlib import Path
+# Add config directory to path for imports
+config_dir = Path(__file__).parent.parent.parent / "config"
+sys.path.insert(0, str(config_dir))
+from settings_manager import get_settings
+
+
+API_VERSION = "7.1"
+# The WIT $batch endpoint is only published for this version
+BATCH_API_VERSION = "4.1"
+# Maximum work items accepted by one $batch or workitemsbatch call
+MAX_BATCH_SIZE = 200
+PARENT_RELATION = "System.LinkTypes.Hierarchy-Reverse"
+# Connection pool shared by every request of a client; idle connections are
+# kept for five minutes so later calls skip the DNS lookup and TLS handshake
+POOL_LIMITS = httpx.Limits(max_connections=16, max_keepalive_connections=8, keepalive_expiry=300.0)
+# Failed connection attempts are retried by the transport this many times
+CONNECT_RETRIES = 3
+JSON_PATCH_HEADERS = {"Content-Type": "application/json-patch+json"}
+# Responses retried with exponential backoff; Azure DevOps answers 429 (with
+# Retry-After) when the caller exceeds its throughput allowance. Any other
+# 4xx fails at once
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+MAX_RETRIES = 3
+# Cap for the computed exponential backoff
+MAX_BACKOFF = 30.0
+# Cap for a server-sent Retry-After; throttling can ask for minutes, and
+# retrying earlier only spends a retry on another 429
+MAX_RETRY_AFTER = 600.0
+
+
+class AzureDevOpsClient:
+    """
+    Async client for the Azure DevOps work item tracking REST API.
+
+    Talks to the REST API directly instead of spawning the ``az`` CLI per call,
+    so work items can be created concurrently over one authenticated session.
+    All requests share one keep-alive connection pool (see ``POOL_LIMITS``).
+    Throttled and failed requests are retried with exponential backoff and
+    jitter, honouring ``Retry-After`` (see ``RETRY_STATUSES``).
+    Use as an async context manager, or call ``aclose`` when done.
+    """
+
+    def __init__(self, organization: str, project: Optional[str] = None, pat: Optional[str] = None):
+        """
+        Initialize the client.
+
+        Args:
+            organization: Azure DevOps organization URL (e.g. https://dev.azure.com/myorg)
+            project: Azure DevOps project name (only needed to create work items)
+            pat: Personal access token (default: settings file or AZURE_DEVOPS_PAT)
+        """
+        pat = pat or get_settings().get_api_key('azure_devops')
+        if not pat:
+            raise ValueError(
+                "Azure DevOps PAT not found. Please set it in:\n"
+                "1. config/settings.json under 'api_keys.azure_devops_pat', or\n"
+                "2. AZURE_DEVOPS_PAT environment variable"
+            )
+
+        self.organization = organization.rstrip('/')
+        self.project = project
+
+        token = base64.b64encode(f":{pat}".encode('utf-8')).decode('ascii')
+        self._client = httpx.AsyncClient(
+            headers={"Authorization": f"Basic {token}"},
+            transport=httpx.AsyncHTTPTransport(limits=POOL_LIMITS, retries=CONNECT_RETRIES),
+            timeout=30.0
+        )
+
+    async def __aenter__(self) -> "AzureDevOpsClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP session."""
+        await self._client.aclose()
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Send a request, retrying responses in ``RETRY_STATUSES``.
+
+        Waits ``Retry-After`` seconds as sent by the server (up to
+        ``MAX_RETRY_AFTER``), otherwise ``2 ** attempt`` seconds plus jitter,
+        capped at ``MAX_BACKOFF``.
+
+        Raises:
+            httpx.HTTPStatusError: If the API still rejects the request after
+                ``MAX_RETRIES`` retries
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            response = await self._client.request(method, url, **kwargs)
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                break
+
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                delay = min(MAX_RETRY_AFTER, float(retry_after))
+            else:
+                delay = min(MAX_BACKOFF, 2 ** attempt + random.random())
+            await asyncio.sleep(delay)
+
+        response.raise_for_status()
+        return response
+
+    async def get_work_item(self, work_item_id: int, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Fetch one work item.
+
+        Args:
+            work_item_id: ID of the work item
+            fields: Field reference names to return (default: all fields)
+
+        Returns:
+            Work item as returned by the API
+
+        Raises:
+            httpx.HTTPStatusError: If the API rejects the request
+        """
+        params = {"api-version": API_VERSION}
+        if fields:
+            params["fields"] = ",".join(fields)
+
+        response = await self._request(
+            "GET",
+            f"{self.organization}/_apis/wit/workitems/{work_item_id}",
+            params=params
+        )
+        return loads(response.content)
+
+    async def update_work_items_batch(
+        self,
+        updates: List[Tuple[int, Dict[str, Any]]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Set fields on several existing work items through the ``$batch`` endpoint.
+
+        Up to 200 updates go in one request.
+
+        Args:
+            updates: (work item ID, field reference names mapped to new values) pairs
+
+        Returns:
+            Updated work item per input pair, in order (None where the update failed)
+
+        Raises:
+            httpx.HTTPStatusError: If the API rejects a batch request as a whole
+        """
+        updated = []
+
+        for start in range(0, len(updates), MAX_BATCH_SIZE):
+            chunk = updates[start:start + MAX_BATCH_SIZE]
+            body = [
+                {
+                    "method": "PATCH",
+                    "uri": f"/_apis/wit/workitems/{int(work_item_id)}?api-version={BATCH_API_VERSION}",
+                    "headers": JSON_PATCH_HEADERS,
+                    "body": self.field_operations(fields)
+                }
+                for work_item_id, fields in chunk
+            ]
+
+            # Setting fields is idempotent, so every retryable status is retried
+            response = await self._request(
+                "POST",
+                f"{self.organization}/_apis/wit/$batch?api-version={BATCH_API_VERSION}",
+                json=body
+            )
+
+            results = loads(response.content).get("value", [])
+            for index in range(len(chunk)):
+                result = results[index] if index < len(results) else {}
+                updated.append(loads(result["body"]) if result.get("code") == 200 else None)
+
+        return updated
+
+    async def query_work_items(self, wiql: str) -> Dict[str, Any]:
+        """
+        Run a WIQL query.
+
+        Args:
+            wiql: Query text
+
+        Returns:
+            Query result; ``workItems`` (flat queries) or ``workItemRelations``
+            (link queries) hold the matching IDs
+
+        Raises:
+            httpx.HTTPStatusError: If the API rejects the query
+        """
+        response = await self._request(
+            "POST",
+            f"{self.organization}/_apis/wit/wiql?api-version={API_VERSION}",
+            json={"query": wiql}
+        )
+        return loads(response.content)
+
+    async def get_work_items_batch(
+        self,
+        work_item_ids: List[int],
+        fields: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch many work items through the ``workitemsbatch`` endpoint.
+
+        IDs are sent 200 per request (the API limit), so N work items cost
+        ceil(N / 200) round trips instead of N; those requests run concurrently.
+
+        Args:
+            work_item_ids: IDs of the work items to fetch
+            fields: Field reference names to return (default: all fields)
+
+        Returns:
+            Work items in the order the API returns them
+
+        Raises:
+            httpx.HTTPStatusError: If the API rejects a request
+        """
+        chunks = await asyncio.gather(*(
+            self._fetch_work_items_chunk(work_item_ids[start:start + MAX_BATCH_SIZE], fields)
+            for start in range(0, len(work_item_ids), MAX_BATCH_SIZE)
+        ))
+        return [work_item for chunk in chunks for work_item in chunk]
+
+    async def iter_work_items_batches(
+        self,
+        work_item_ids: List[int],
+        fields: Optional[List[str]] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Fetch many work items one ``workitemsbatch`` page (200 IDs) at a time.
+
+        Unlike ``get_work_items_batch``, pages are requested in order and each
+        is yielded as soon as it arrives, so callers can start on the first
+        work items while later pages are still being fetched.
+
+        Args:
+            work_item_ids: IDs of the work items to fetch
+            fields: Field reference names to return (default: all fields)
+
+        Yields:
+            Work items of each page, in the order the API returns them
+
+        Raises:
+            httpx.HTTPStatusError: If the API rejects a request
+        """
+        for start in range(0, len(work_item_ids), MAX_BATCH_SIZE):
+            yield await self._fetch_work_items_chunk(work_item_ids[start:start + MAX_BATCH_SIZE], fields)
+
+    async def _fetch_work_items_chunk(
+        self,
+        work_item_ids: List[int],
+        fields: Optional[List[str]]
+    ) -> List[Dict[str, Any]]:
+        """Fetch up to ``MAX_BATCH_SIZE`` work items in one ``workitemsbatch`` request."""
+        body = {"ids": [int(work_item_id) for work_item_id in work_item_ids]}
+        if fields:
+            body["fields"] = fields
+
+        response = await self._request(
+            "POST",
+            f"{self.organization}/_apis/wit/workitemsbatch?api-version={API_VERSION}",
+            json=body
+        )
+        return loads(response.content).get("value", [])
+
+    def work_item_url(self, work_item_id: int) -> str:
+        """API URL of a work item, as used in relation links."""
+        return f"{self.organization}/_apis/wit/workItems/{work_item_id}"
+
+    @staticmethod
+    def field_operations(fields: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """JSON-Patch operations setting each field that has a value."""
+        return [
+            {"op": "add", "path": f"/fields/{name}", "value": value}
+            for name, value in fields.items()
+            if value
+        ]
+
+    def build_patch_document(
+        self,
+        fields: Dict[str, Any],
+        parent_id: Optional[int] = None,
+        base_operations: Sequence[Dict[str, Any]] = ()
+    ) -> List[Dict[str, Any]]:
+        """
+        Build a JSON-Patch document setting fields and, optionally, the parent link.
+
+        Args:
+            fields: Work item field reference names mapped to values
+            parent_id: Optional parent work item ID
+            base_operations: Prebuilt operations shared by many documents (e.g.
+                area and iteration path), placed before the field operations
+
+        Returns:
+            List of JSON-Patch operations
+        """
+        document = [*base_operations, *self.field_operations(fields)]
+
+        if parent_id:
+            document.append({
+                "op": "add",
+                "path": "/relations/-",
+                "value": {"rel": PARENT_RELATION, "url": self.work_item_url(parent_id)}
+            })
+
+        return document
+
+    async def create_work_items_batch(self, items: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Create several work items through the ``$batch`` endpoint.
+
+        Items may reference each other through temporary negative IDs: give an
+        item ``"temp_id": -1`` and point others at it with ``"parent_id": -1``.
+        Up to 200 items go in one request; a temporary ID created in an earlier
+        chunk is replaced by its real ID in later chunks.
+
+        Args:
+            items: Dicts with ``type``, ``fields`` and optional ``temp_id`` /
+                ``parent_id`` / ``base_operations``
+
+        Returns:
+            Created work item per input item, in order (None where creation failed)
+
+        Raises:
+            httpx.HTTPStatusError: If the API rejects a batch request as a whole
+        """
+        created = []
+        resolved_ids = {}
+
+        for start in range(0, len(items), MAX_BATCH_SIZE):
+            chunk = items[start:start + MAX_BATCH_SIZE]
+            body = [
+                self._batch_subrequest(
+                    item["type"],
+                    item["fields"],
+                    resolved_ids.get(item.get("parent_id"), item.get("parent_id")),
+                    item.get("temp_id"),
+                    item.get("base_operations", ())
+                )
+                for item in chunk
+            ]
+
+            response = await self._request(
+                "POST",
+                f"{self.organization}/_apis/wit/$batch?api-version={BATCH_API_VERSION}",
+                json=body
+            )
+
+            # Each sub-response body is the full work item as a JSON string;
+            # decode the envelope and the bodies with orjson when available
+            results = loads(response.content).get("value", [])
+            for index, item in enumerate(chunk):
+                result = results[index] if index < len(results) else {}
+                work_item = loads(result["body"]) if result.get("code") == 200 else None
+                if work_item and item.get("temp_id") is not None:
+                    resolved_ids[item["temp_id"]] = work_item["id"]
+                created.append(work_item)
+
+        return created
+
+    def _batch_subrequest(
+        self,
+        work_item_type: str,
+        fields: Dict[str, Any],
+        parent_id: Optional[int],
+        temp_id: Optional[int],
+        base_operations: Sequence[Dict[str, Any]] = ()
+    ) -> Dict[str, Any]:
+        """Build one ``$batch`` sub-request creating a work item."""
+        document = self.build_patch_document(fields, parent_id, base_operations)
+        if temp_id is not None:
+            document.insert(0, {"op": "add", "path": "/id", "value": str(temp_id)})
+
+        return {
+            "method": "PATCH",
+            "uri": (
+                f"/{quote(self.project)}/_apis/wit/workitems/"
+                f"${quote(work_item_type)}?api-version={BATCH_API_VERSION}"
+            ),
+            "headers": JSON_PATCH_HEADERS,
+            "body": document
+        }
@@ -0,0 +1,117 @@
+"""Celery tasks for running workflow steps on distributed workers.
+
+Requires the ``celery`` package and a broker (e.g. Redis) configured under
+``celery`` in config/settings.json. Start workers from the repository root with:
+
+    celery -A agentic_pipeline.tasks worker
+
+A step that fails before its agent starts an iteration (e.g. Azure DevOps is
+unreachable while it initializes) has changed nothing and is retried with
+backoff. Once an iteration has started a step is never retried, and because
+steps are acknowledged late, a step whose worker dies mid-run is redelivered
+and runs again from the start. None of the built-in agents is safe to run
+twice: PlanningAgent creates work items, TDDAgent commits to git and moves
+tasks between states, and CodeReviewAgent and DebugAgent edit files.
+Composite agents are not distributed; only their leaf steps are.
+"""
+
+import importlib
+from typing import Any, Dict
+
+from celery import Celery
+
+from .composition.composite import CompositeAgent
+from .core.agent import Agent
+from .core.config import AgentConfig
+from .core.pipeline import AgentPipeline
+
+import sys
+from pathlib import Path
+# Add config directory to path for imports
+config_dir = Path(__file__).parent.parent / "config"
+sys.path.insert(0, str(config_dir))
+from settings_manager import get_settings
+
+
+_celery_config = get_settings().get('celery', {})
+
+app = Celery(
+    "agent_tasks",
+    broker=_celery_config.get('broker_url'),
+    backend=_celery_config.get('result_backend')
+)
+app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    # A step is only acknowledged once it has run, so a crashed worker's
+    # step is redelivered to another worker
+    task_acks_late=True,
+    worker_prefetch_multiplier=1
+)
+
+# Retries for a step that failed before its first iteration
+MAX_STEP_RETRIES = 3
+STEP_RETRY_DELAY = 60
+
+
+class StepNotStarted(Exception):
+    """A step's pipeline failed before its agent ran an iteration."""
+
+
+def serialize_agent(agent: Agent) -> Dict[str, Any]:
+    """
+    Describe an agent so a worker can rebuild it from its class and configuration.
+
+    Raises:
+        TypeError: If the agent is a CompositeAgent, whose steps, mode and
+            transitions its configuration does not carry
+    """
+    if isinstance(agent, CompositeAgent):
+        raise TypeError(f"Composite agent {agent.name} cannot run as a distributed step")
+    agent_class = type(agent)
+    return {
+        "module": agent_class.__module__,
+        "class": agent_class.__qualname__,
+        "config": agent.config.to_dict()
+    }
+
+
+def deserialize_agent(step: Dict[str, Any]) -> Agent:
+    """Rebuild an agent described by ``serialize_agent``."""
+    agent_class = getattr(importlib.import_module(step["module"]), step["class"])
+    return agent_class(AgentConfig.from_dict(step["config"]))
+
+
+@app.task(
+    bind=True,
+    autoretry_for=(StepNotStarted,),
+    max_retries=MAX_STEP_RETRIES,
+    default_retry_delay=STEP_RETRY_DELAY,
+    retry_backoff=STEP_RETRY_DELAY
+)
+def run_agent_step(self, step: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run one workflow step's agent to completion in its own pipeline.
+
+    Args:
+        step: Agent description from ``serialize_agent``
+        context: Step context passed to the agent's ``initialize``
+
+    Returns:
+        Pipeline results, as returned by ``AgentPipeline.run``
+
+    Raises:
+        StepNotStarted: If the pipeline failed before the agent's first
+            iteration (retried up to MAX_STEP_RETRIES times before it surfaces)
+    """
+    pipeline = AgentPipeline(deserialize_agent(step))
+    started = []
+    pipeline.add_hook('pre_iteration', lambda *args: started.append(True))
+    results = pipeline.run(context)
+
+    pipeline_status = results["pipeline_status"]
+    if pipeline_status["final_status"] == "failed" and not started:
+        errors = "; ".join(pipeline_status["errors"]) or "unknown error"
+        raise StepNotStarted(f"Step {step['class']} failed before its first iteration: {errors}")
+    return results
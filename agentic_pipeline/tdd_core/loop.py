@@ -1,6 +1,7 @@
 """Main TDD DevOps Loop orchestrator."""
 
-import os
+import sys
+from pathlib import Path
 from typing import Optional, Dict, Any
 
 from .config import Configuration
@@ -8,13 +9,18 @@ from .sdk_session_manager import ClaudeSDKSessionManager
 from ..utils.logger import Logger
 from ..utils.usage_parser import UsageLimitParser
 
+# Add config directory to path for imports
+config_dir = Path(__file__).parent.parent.parent / "config"
+sys.path.insert(0, str(config_dir))
+from settings_manager import get_settings
+
 
 class TDDDevOpsLoop:
     """Main orchestrator for the TDD DevOps Loop."""
     
     def __init__(self, config: Configuration = None):
         self.config = config or Configuration()
-        self.logger = Logger()
+        self.logger = Logger(get_settings().get('logging.level', 'info'))
         self.usage_parser = UsageLimitParser()
         self.session_manager = ClaudeSDKSessionManager(self.config, self.logger, self.usage_parser)
     
@@ -39,15 +45,13 @@ class TDDDevOpsLoop:
             return False
     
     def run(self, project_path: str, ticket_number: str) -> None:
-        """Run the TDD DevOps loop."""
-        os.chdir(project_path)
-        
+        """Run the TDD DevOps loop in project_path (the process working directory is left alone)."""
         iteration = 1
         
         while iteration <= self.config.max_iterations:
             self.logger.iteration_header(iteration)
             
-            final_result, usage_limit_epoch, return_code = self.session_manager.run_single_iteration(ticket_number)
+            final_result, usage_limit_epoch, return_code = self.session_manager.run_single_iteration(ticket_number, cwd=project_path)
             
             is_complete = self.print_iteration_result(final_result)
             
@@ -76,6 +76,13 @@ class PlanningSessionManager:
             self.logger.error(f"Error in async specification analysis: {e}")
             return None
     
+    def analysis_prompt_templates(self) -> Dict[str, str]:
+        """The system prompt and the spec-less analysis prompt, which fix how a spec is analyzed."""
+        return {
+            "system": self._build_system_prompt(),
+            "analysis": self._build_analysis_prompt("")
+        }
+    
     def _build_system_prompt(self) -> str:
         """Build the system prompt for specification analysis."""
         return f"""You are an expert Business Analyst and Test Engineer specializing in converting natural language specifications into structured work items for agile development.
@@ -1,18 +1,41 @@
 """Claude Code SDK session management - pure SDK implementation."""
 
+import asyncio
+import html
 import json
-from typing import Tuple, Optional, Dict, Any
+import re
+from typing import Callable, Tuple, Optional, Dict, Any
 
 import anyio
-from claude_code_sdk import query, ClaudeCodeOptions
+from claude_code_sdk import query, ClaudeCodeOptions, ClaudeSDKClient
 
 from .config import Configuration, ExecutionContext
 from .response_processor import ResponseProcessor
 from ..parsers.json_parsers import JsonParsingChain
 
 
+TDD_SYSTEM_PROMPT = (
+    "You are an expert software engineer performing Test-Driven Development. "
+    "You must actively explore the codebase, write tests, and implement code. "
+    "Use all available tools to complete the task. Do not just analyze - take action!"
+)
+
+
 class ClaudeSDKSessionManager:
-    """Pure Claude Code SDK session manager - no fallbacks, SDK only."""
+    """
+    Pure Claude Code SDK session manager - no fallbacks, SDK only.
+    
+    By default every iteration is a one-shot ``query()``, which starts a new
+    Claude Code process. Between ``start()`` and ``close()`` iterations are
+    instead sent to one connected ``ClaudeSDKClient``, so the process (and the
+    conversation) is reused across a task's iterations. When the iterations
+    move on to another task the client is reconnected, so one task's context
+    never carries over into (and adds cost to) the next.
+    The client has to be connected and disconnected
+    from the same task, so it is owned by a worker task fed through a queue;
+    ``start``, ``close`` and ``run_single_iteration_async`` must therefore be
+    called from the same event loop.
+    """
     
     def __init__(self, config: Configuration, logger, usage_parser):
         self.config = config
@@ -23,54 +46,143 @@ class ClaudeSDKSessionManager:
         self.context = ExecutionContext(logger, usage_parser, config)
         self.parsing_chain = JsonParsingChain()
         self.response_processor = ResponseProcessor(self.parsing_chain, logger)
+        
+        # Persistent session, set up by start()
+        self._session_cwd = None
+        self._requests = None
+        self._worker = None
+        # ID of the task the open session's conversation is about, once known
+        self._session_task_id = None
     
-    def run_single_iteration(self, task_details: Dict) -> Tuple[Optional[int], int]:
-        """Run a single TDD iteration using the Claude Code SDK."""
+    async def start(self, cwd: Optional[str] = None) -> None:
+        """
+        Keep one Claude Code session open for every following iteration.
+        
+        Args:
+            cwd: Project directory the session works in; it replaces the ``cwd``
+                passed to each iteration while the session is open
+        """
+        self._session_cwd = cwd
+        self._session_task_id = None
+        self._requests = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run_client())
+    
+    async def close(self) -> None:
+        """Disconnect the persistent session, if one was started."""
+        if self._worker is None:
+            return
+        
+        if not self._worker.done():
+            await self._requests.put(None)
+        await asyncio.gather(self._worker, return_exceptions=True)
+        self._worker = None
+    
+    def run_single_iteration(self, task_details: Dict, cwd: Optional[str] = None) -> Tuple[Optional[int], int]:
+        """
+        Run a single TDD iteration using the Claude Code SDK.
+        
+        Args:
+            task_details: Task to work on
+            cwd: Project directory Claude works in. Passed to the SDK explicitly
+                rather than relying on the process working directory, so callers
+                must not assume (or change) os.getcwd()
+        """
+        # Run the async iteration in a sync context
+        return anyio.run(self.run_single_iteration_async, task_details, cwd)
+    
+    async def run_single_iteration_async(self, task_details: Dict, cwd: Optional[str] = None) -> Tuple[Optional[int], int]:
+        """Run a single TDD iteration on the caller's event loop (see run_single_iteration)."""
         try:
-            # Run the async iteration in a sync context
-            return anyio.run(self._async_run_single_iteration, task_details)
+            return await self._async_run_single_iteration(task_details, cwd)
         except Exception as e:
             self.logger.error(f"Error running SDK iteration: {e}")
             return None, 1
     
-    async def _async_run_single_iteration(self, task_details: Dict) -> Tuple[Optional[int], int]:
+    def _tdd_options(self, cwd: Optional[str]) -> ClaudeCodeOptions:
+        """SDK options for TDD work in the given project directory."""
+        return ClaudeCodeOptions(
+            system_prompt=TDD_SYSTEM_PROMPT,
+            # Enable all tools for full Claude Code functionality
+            allowed_tools=None,  # Allow all tools
+            permission_mode="bypassPermissions",  # Equivalent to --dangerously-skip-permissions
+            cwd=cwd
+        )
+    
+    async def _run_client(self) -> None:
+        """Own the persistent SDK client and serve queued prompts until closed."""
+        async with ClaudeSDKClient(options=self._tdd_options(self._session_cwd)) as client:
+            while True:
+                request = await self._requests.get()
+                if request is None:
+                    return
+                
+                prompt, on_message, future = request
+                try:
+                    await client.query(prompt)
+                    async for message in client.receive_response():
+                        on_message(message)
+                    future.set_result(None)
+                except Exception as e:
+                    future.set_exception(e)
+    
+    async def _scope_session_to(self, task_id: Any) -> None:
+        """Reconnect the persistent session if its conversation is about another task."""
+        if self._session_task_id is not None and task_id != self._session_task_id:
+            self.logger.info(f"🔁 Moving on to task {task_id} - starting a fresh Claude Code SDK session")
+            await self.close()
+            await self.start(cwd=self._session_cwd)
+        self._session_task_id = task_id
+    
+    async def _ask_session(self, prompt: str, on_message: Callable[[Any], None]) -> None:
+        """Send a prompt to the persistent session, passing each reply message to on_message."""
+        if self._worker.done():
+            # The client dropped out (e.g. the CLI exited); reconnect
+            self._worker = asyncio.create_task(self._run_client())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._requests.put((prompt, on_message, future))
+        await asyncio.wait({future, self._worker}, return_when=asyncio.FIRST_COMPLETED)
+        
+        if not future.done():
+            self._worker.result()
+            raise RuntimeError("Claude SDK session ended unexpectedly")
+        future.result()
+    
+    async def _async_run_single_iteration(self, task_details: Dict, cwd: Optional[str] = None) -> Tuple[Optional[int], int]:
         """Async implementation of single TDD iteration."""
         # Build structured TDD prompt from task details
         initial_prompt = self._build_tdd_prompt(task_details)
         
         usage_limit_reset_epoch = None
-        collected_messages = []
+        message_count = 0
         
-        try:
-            # Configure SDK options for the initial work
-            options = ClaudeCodeOptions(
-                system_prompt="You are an expert software engineer performing Test-Driven Development. "
-                           "You must actively explore the codebase, write tests, and implement code. "
-                           "Use all available tools to complete the task. Do not just analyze - take action!",
-                # Enable all tools for full Claude Code functionality
-                allowed_tools=None,  # Allow all tools
-                permission_mode="bypassPermissions"  # Equivalent to --dangerously-skip-permissions
-            )
+        def handle_message(message) -> None:
+            nonlocal usage_limit_reset_epoch, message_count
+            message_count += 1
             
+            # Process each message for usage limits or other important info
+            message_text = self._extract_message_text(message)
+            # Note: message_text logging is handled in _extract_message_text
+            
+            # Check for usage limits in text messages
+            if message_text:
+                epoch = self.usage_parser.parse_usage_limit_epoch(message_text)
+                if epoch:
+                    usage_limit_reset_epoch = max(usage_limit_reset_epoch or 0, epoch)
+        
+        try:
             # Stream the initial TDD work
-            self.logger.info("🚀 Starting Claude Code SDK session - tool usage will be embedded in responses")
-            message_count = 0
-            async for message in query(
-                prompt=initial_prompt, 
-                options=options
-            ):
-                message_count += 1
-                collected_messages.append(message)
-                
-                # Process each message for usage limits or other important info
-                message_text = self._extract_message_text(message)
-                # Note: message_text logging is handled in _extract_message_text
-                
-                # Check for usage limits in text messages
-                if message_text:
-                    epoch = self.usage_parser.parse_usage_limit_epoch(message_text)
-                    if epoch:
-                        usage_limit_reset_epoch = max(usage_limit_reset_epoch or 0, epoch)
+            if self._worker is not None:
+                await self._scope_session_to(task_details.get('id'))
+                self.logger.info("🚀 Continuing Claude Code SDK session - tool usage will be embedded in responses")
+                await self._ask_session(initial_prompt, handle_message)
+            else:
+                self.logger.info("🚀 Starting Claude Code SDK session - tool usage will be embedded in responses")
+                async for message in query(
+                    prompt=initial_prompt, 
+                    options=self._tdd_options(cwd)
+                ):
+                    handle_message(message)
             
             # Log completion with message count
             self.logger.info(f"✅ TDD iteration completed successfully ({message_count} messages received)")
@@ -264,6 +376,15 @@ class ClaudeSDKSessionManager:
         description = self._clean_html(description)
         acceptance_criteria = self._clean_html(acceptance_criteria)
         
+        # Reflection feedback on the previous iteration, if this is a retry
+        feedback = task_details.get('reflection_feedback')
+        feedback_section = ""
+        if feedback:
+            feedback_section = (
+                f"**REFLECTION FEEDBACK FROM PREVIOUS ITERATION:**\n{feedback}\n\n"
+                f"Please address this feedback in your next TDD iteration.\n\n"
+            )
+        
         prompt = f"""You are implementing Task {task_id}: {title}
 
 **DESCRIPTION:**
@@ -272,7 +393,7 @@ class ClaudeSDKSessionManager:
 **ACCEPTANCE CRITERIA/BDD SCENARIOS:**
 {acceptance_criteria}
 
-**TDD ITERATION OBJECTIVE:**
+{feedback_section}**TDD ITERATION OBJECTIVE:**
 Follow strict TDD methodology for this single iteration:
 
 1. **Explore** the codebase to understand existing structure (if first time working on this task)
@@ -306,7 +427,6 @@ Start by exploring the codebase, then write your single failing test that tests
     
     def _detect_tool_usage_patterns(self, text: str) -> None:
         """Detect and log tool usage patterns in Claude's responses."""
-        import re
         lower_text = text.lower()
         
         # Common tool usage patterns - using regex for more flexible matching
@@ -445,9 +565,6 @@ Start by exploring the codebase, then write your single failing test that tests
         if not text:
             return ""
         
-        import re
-        import html
-        
         # Remove HTML tags
         text = re.sub(r'<[^>]+>', '', text)
         # Decode HTML entities
@@ -0,0 +1,253 @@
+"""Async helpers for invoking Claude Code: one-shot CLI runs and persistent SDK sessions."""
+
+import asyncio
+import functools
+import shutil
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from claude_code_sdk import AssistantMessage, ClaudeCodeOptions, ClaudeSDKClient, ResultMessage, TextBlock
+
+
+# stderr is only logged, so only its tail is kept
+STDERR_TAIL_BYTES = 16 * 1024
+
+# Bytes read from stderr at a time; it is not split into lines, so no single
+# line, however long, can overrun the stream reader's buffer limit
+STDERR_CHUNK_SIZE = 64 * 1024
+
+
+class _OutputTail:
+    """Bounded buffer of the most recent ``max_bytes`` of output."""
+    
+    def __init__(self, max_bytes: int = STDERR_TAIL_BYTES):
+        self._buffer = bytearray()
+        self._max_bytes = max_bytes
+    
+    def append(self, data: bytes) -> None:
+        self._buffer += data
+        if len(self._buffer) > self._max_bytes:
+            del self._buffer[:-self._max_bytes]
+    
+    async def drain(self, stream: asyncio.StreamReader) -> None:
+        """Consume a stream to EOF in fixed-size chunks, keeping only its tail."""
+        while True:
+            chunk = await stream.read(STDERR_CHUNK_SIZE)
+            if not chunk:
+                return
+            self.append(chunk)
+    
+    def take(self) -> str:
+        """Return the buffered text and clear the buffer."""
+        text = self._buffer.decode('utf-8', errors='replace')
+        self._buffer.clear()
+        return text
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_executable(name: str) -> str:
+    """Resolve a command name to its path once; unresolvable names are left as-is."""
+    return shutil.which(name) or name
+
+
+async def _spawn(cmd: List[str], **kwargs: Any) -> asyncio.subprocess.Process:
+    """
+    Start a subprocess with piped stdout/stderr on CPython's posix_spawn fast path.
+    
+    Popen only uses posix_spawn (instead of fork+exec, whose cost grows with the
+    parent's memory) when given an executable path and close_fds=False. Keeping
+    inherited fds open is safe since Python creates them non-inheritable.
+    """
+    return await asyncio.create_subprocess_exec(
+        _resolve_executable(cmd[0]), *cmd[1:],
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        close_fds=False,
+        **kwargs
+    )
+
+
+async def run_process(
+    cmd: List[str],
+    timeout: Optional[float] = None,
+    env: Optional[Dict[str, str]] = None
+) -> Tuple[int, str, str]:
+    """
+    Run a command without blocking the event loop.
+
+    Args:
+        cmd: Command and arguments to execute
+        timeout: Optional timeout in seconds; the process is killed when exceeded
+        env: Optional environment for the command (default: inherit this process's)
+
+    Returns:
+        Tuple of (return code, stdout, stderr tail)
+
+    Raises:
+        asyncio.TimeoutError: If the command did not finish within the timeout
+    """
+    process = await _spawn(cmd, env=env)
+    stderr_tail = _OutputTail()
+
+    try:
+        stdout, _, _ = await asyncio.wait_for(
+            asyncio.gather(process.stdout.read(), stderr_tail.drain(process.stderr), process.wait()),
+            timeout=timeout
+        )
+    finally:
+        # On a timeout, cancellation or read error, never leave the child running or unreaped
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+    return (
+        process.returncode,
+        stdout.decode('utf-8', errors='replace'),
+        stderr_tail.take()
+    )
+
+
+async def run_claude(args: List[str], timeout: Optional[float] = None) -> Tuple[int, str, str]:
+    """Run the ``claude`` CLI with the given arguments and return (return code, stdout, stderr)."""
+    return await run_process(['claude', *args], timeout=timeout)
+
+
+def assistant_text(event: Dict[str, Any]) -> str:
+    """Extract the text blocks from a stream-json ``assistant`` event."""
+    content = event.get('message', {}).get('content', [])
+    return ''.join(block.get('text', '') for block in content if block.get('type') == 'text')
+
+
+def _message_to_event(message: Any) -> Optional[Dict[str, Any]]:
+    """Convert an SDK message into the equivalent stream-json event dict."""
+    if isinstance(message, AssistantMessage):
+        return {
+            'type': 'assistant',
+            'message': {
+                'content': [
+                    {'type': 'text', 'text': block.text}
+                    for block in message.content if isinstance(block, TextBlock)
+                ]
+            }
+        }
+    if isinstance(message, ResultMessage):
+        return {
+            'type': 'result',
+            'subtype': message.subtype,
+            'is_error': message.is_error,
+            'result': message.result or '',
+            'session_id': message.session_id,
+            'total_cost_usd': message.total_cost_usd
+        }
+    return None
+
+
+class ClaudeSession:
+    """
+    Persistent Claude conversation reused across agent iterations.
+    
+    A single in-process ``ClaudeSDKClient`` serves every prompt, so session
+    state and the prompt cache survive between iterations.
+    
+    The SDK client has to be connected and disconnected from the same task, so
+    it is owned by one long-lived worker task fed through a queue. All calls to
+    ``ask`` and ``close`` must therefore come from the same event loop.
+    """
+    
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        allowed_tools: Optional[List[str]] = None
+    ):
+        """
+        Initialize the session.
+        
+        Args:
+            model: Optional Claude model name (default: CLI default model)
+            system_prompt: Optional invariant instructions appended to the system
+                prompt, so they form a stable, cacheable prefix for every prompt
+            allowed_tools: Optional tool allow-list; when given, permissions are
+                not bypassed and every other tool is denied
+        """
+        self.model = model
+        self.system_prompt = system_prompt
+        self.allowed_tools = allowed_tools
+        self._requests = None
+        self._worker = None
+    
+    async def ask(
+        self,
+        prompt: str,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Send a prompt and wait for the final result.
+        
+        Args:
+            prompt: Prompt to send
+            on_event: Optional callback invoked for every stream-json style event
+            
+        Returns:
+            Final ``result`` event, or None if the reply had none
+        """
+        if self._worker is None or self._worker.done():
+            # First prompt, or the client dropped out (e.g. the CLI exited); reconnect
+            self._requests = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run_client())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._requests.put((prompt, on_event, future))
+        try:
+            await asyncio.wait({future, self._worker}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            # Abandon a stuck client (e.g. on timeout); the next prompt reconnects
+            if not future.done():
+                self._worker.cancel()
+                self._worker = None
+            raise
+        
+        if not future.done():
+            self._worker.result()
+            raise RuntimeError("Claude SDK session ended unexpectedly")
+        return future.result()
+    
+    async def close(self) -> None:
+        """Disconnect the SDK client, if one was started."""
+        if self._worker is None:
+            return
+        
+        if not self._worker.done():
+            await self._requests.put(None)
+        await asyncio.gather(self._worker, return_exceptions=True)
+        self._worker = None
+    
+    async def _run_client(self) -> None:
+        """Own the SDK client and serve queued prompts until closed."""
+        options = ClaudeCodeOptions(
+            model=self.model,
+            append_system_prompt=self.system_prompt,
+            allowed_tools=self.allowed_tools or [],
+            permission_mode=None if self.allowed_tools else 'bypassPermissions'
+        )
+        
+        async with ClaudeSDKClient(options=options) as client:
+            while True:
+                request = await self._requests.get()
+                if request is None:
+                    return
+                
+                prompt, on_event, future = request
+                try:
+                    await client.query(prompt)
+                    final_event = None
+                    async for message in client.receive_response():
+                        event = _message_to_event(message)
+                        if event is None:
+                            continue
+                        if on_event:
+                            on_event(event)
+                        if event['type'] == 'result':
+                            final_event = event
+                    future.set_result(final_event)
+                except Exception as e:
+                    future.set_exception(e)
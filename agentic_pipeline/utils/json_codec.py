@@ -0,0 +1,32 @@
+"""JSON encoding/decoding that uses orjson when it is installed."""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSONDecodeError = json.JSONDecodeError
+
+# orjson decodes bytes or str in C; its JSONDecodeError subclasses json's
+loads = orjson.loads if orjson is not None else json.loads
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode an object as compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def dumps_canonical(obj: Any) -> bytes:
+    """
+    Encode an object as compact UTF-8 JSON with sorted keys, for hashing.
+    
+    Values JSON cannot represent are encoded as their ``str()``.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(',', ':'), sort_keys=True, default=str).encode('utf-8')
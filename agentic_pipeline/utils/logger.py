@@ -6,36 +6,77 @@ from datetime import datetime, timezone
 from typing import Dict, Any
 
 
+# Severity of each log method; messages below the logger's level are dropped
+LEVELS = {"debug": 10, "info": 20, "success": 20, "warning": 30, "error": 40}
+
+
 class Logger:
     """Handles timestamped console output with consistent formatting."""
     
+    def __init__(self, level: str = "info"):
+        """
+        Initialize the logger.
+        
+        Args:
+            level: Lowest level that is printed ("debug", "info", "warning", "error";
+                case-insensitive)
+            
+        Raises:
+            ValueError: If the level is not one of the above
+        """
+        normalized = level.lower()
+        if normalized not in LEVELS:
+            raise ValueError(f"Unknown log level {level!r}; expected debug, info, warning or error")
+        self.level = LEVELS[normalized]
+    
+    def is_enabled_for(self, level: str) -> bool:
+        """Whether a message at this level would be printed."""
+        return LEVELS.get(level, LEVELS["info"]) >= self.level
+    
     @staticmethod
     def get_timestamp() -> str:
         """Get current timestamp for logging."""
         return datetime.now().strftime("%H:%M:%S")
     
+    def debug(self, message: str) -> None:
+        """Log a debug message with timestamp, if debug output is enabled."""
+        if not self.is_enabled_for("debug"):
+            return
+        timestamp = self.get_timestamp()
+        print(f"[{timestamp}] 🔍 {message}")
+    
     def info(self, message: str) -> None:
         """Log an info message with timestamp."""
+        if not self.is_enabled_for("info"):
+            return
         timestamp = self.get_timestamp()
         print(f"[{timestamp}] {message}")
     
     def warning(self, message: str) -> None:
         """Log a warning message with timestamp."""
+        if not self.is_enabled_for("warning"):
+            return
         timestamp = self.get_timestamp()
         print(f"[{timestamp}] ⚠️  {message}")
     
     def error(self, message: str) -> None:
         """Log an error message with timestamp."""
+        if not self.is_enabled_for("error"):
+            return
         timestamp = self.get_timestamp()
         print(f"[{timestamp}] ❌ {message}")
     
     def success(self, message: str) -> None:
         """Log a success message with timestamp."""
+        if not self.is_enabled_for("success"):
+            return
         timestamp = self.get_timestamp()
         print(f"[{timestamp}] ✅ {message}")
     
     def tool_action(self, tool_name: str, action_description: str) -> None:
         """Log tool usage with appropriate emoji and timestamp."""
+        if not self.is_enabled_for("info"):
+            return
         timestamp = self.get_timestamp()
         
         emoji_map = {
@@ -53,16 +94,22 @@ class Logger:
     
     def assistant_message(self, text: str) -> None:
         """Log assistant text output."""
+        if not self.is_enabled_for("info"):
+            return
         timestamp = self.get_timestamp()
         print(f"\n[{timestamp}] 💭 {text}")
     
     def iteration_header(self, iteration: int) -> None:
         """Log iteration header."""
+        if not self.is_enabled_for("info"):
+            return
         timestamp = self.get_timestamp()
         print(f"\n=== TDD DevOps Loop - Iteration {iteration} === [{timestamp}]")
     
     def session_info(self, session_data: Dict[str, Any]) -> None:
         """Log session initialization information."""
+        if not self.is_enabled_for("info"):
+            return
         print("=" * 60)
         print(f"🚀 Session started (ID: {session_data.get('session_id', 'unknown')[:8]}...)")
         print(f"📁 Working directory: {session_data.get('cwd', 'unknown')}")
@@ -31,7 +31,10 @@ class SettingsManager:
             "tdd_agent": {
                 "max_reflection_retries": 3,
                 "enable_reflection": True,
-                "git_diff_min_size": 50
+                "git_diff_min_size": 50,
+                "work_item_cache_ttl": 300,
+                "reflection_diff_max_lines": 2000,
+                "post_rate_limit_delay": 0
             },
             "planning_agent": {
                 "max_iterations": 1,
@@ -48,6 +51,10 @@ class SettingsManager:
                 "level": "info",
                 "enable_file_logging": False,
                 "log_file_path": "./logs/agentic_pipeline.log"
+            },
+            "celery": {
+                "broker_url": "redis://localhost:6379/0",
+                "result_backend": "redis://localhost:6379/0"
             }
         }
         
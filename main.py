@@ -25,6 +25,11 @@ from agentic_pipeline.agents.planning_agent import PlanningAgent
 # Import utilities
 from agentic_pipeline.utils.logger import Logger
 
+# Add config directory to path for imports
+config_dir = Path(__file__).parent / "config"
+sys.path.insert(0, str(config_dir))
+from settings_manager import get_settings
+
 
 def register_builtin_agents():
     """Register all built-in agents with the global registry."""
@@ -85,7 +90,7 @@ def cmd_list_agents(args):
 def cmd_run_agent(args):
     """Run a single agent."""
     registry = get_registry()
-    logger = Logger()
+    logger = Logger(get_settings().get('logging.level', 'info'))
     
     # Create agent configuration
     config = AgentConfig.create_simple(
@@ -154,7 +159,7 @@ def cmd_run_agent(args):
 
 def cmd_run_workflow(args):
     """Run a predefined workflow."""
-    logger = Logger()
+    logger = Logger(get_settings().get('logging.level', 'info'))
     
     if args.workflow_type == "tdd":
         if not args.project_path or not args.ticket:
@@ -200,7 +205,7 @@ def cmd_run_workflow(args):
 
 def cmd_run_config(args):
     """Run workflow from configuration file."""
-    logger = Logger()
+    logger = Logger(get_settings().get('logging.level', 'info'))
     
     config_path = Path(args.config_file)
     if not config_path.exists():
@@ -237,7 +242,7 @@ def cmd_run_config(args):
 def cmd_tdd_convenience(args):
     """Run TDD agent with familiar command-line interface."""
     registry = get_registry()
-    logger = Logger()
+    logger = Logger(get_settings().get('logging.level', 'info'))
     
     # Create TDD agent configuration with new parameters
     config_params = {
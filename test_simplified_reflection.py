@@ -3,6 +3,7 @@
 
 import sys
 from pathlib import Path
+import asyncio
 import subprocess
 import tempfile
 import os
@@ -111,8 +112,8 @@ And: No mocks should be used for the primary functionality
         try:
             # Test git working changes method
             print("\n📊 Testing _get_git_working_changes()...")
-            working_changes = agent._get_git_working_changes()
-            print(f"Working changes detected: {len(working_changes)} characters")
+            working_changes, lines_changed = asyncio.run(agent._get_git_working_changes())
+            print(f"Working changes detected: {lines_changed} diff lines")
             print("✅ Git working changes method works")
             
             # Test reflection service initialization  
@@ -136,7 +137,7 @@ And: No mocks should be used for the primary functionality
                 # Test commit method
                 print(f"\n💾 Testing commit method...")
                 if result.status == "continue":
-                    success = agent._commit_changes("Test: TDD iteration approved by reflection")
+                    success = asyncio.run(agent._commit_changes("Test: TDD iteration approved by reflection"))
                     if success:
                         print("✅ Changes committed successfully")
                     else: